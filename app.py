@@ -3,14 +3,17 @@ app.py — Final Locked Production Version
 """
 
 import os
+import json
 import time
+import asyncio
 import logging
 from dotenv import load_dotenv
 
 from fastapi import FastAPI, HTTPException, Request, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel
+from typing import List, Optional
 
 # -----------------------
 # ENV LOAD
@@ -46,6 +49,32 @@ from brains.brain_section_copy import SectionCopyBrain
 from brains.brain_outreach import OutreachBrain
 from brains.brain_deep_dive import DeepDiveBrain
 
+from utils.audit_history import AuditHistoryStore, IncrementalDeepAudit
+from utils.usage_ledger import usage_ledger
+from utils.circuit_breaker import CircuitOpenError, breaker_states, configure_breakers
+from utils.copy_rules import rule_based_diagnosis
+from utils.ingress import (
+    BodySizeLimitMiddleware,
+    CompressionMiddleware,
+    FastJSONResponse,
+)
+from utils.profiling import ProfileMiddleware, RequestProfiler
+from utils.lanes import LaneFullError, build_lanes
+from utils.helpers import fetch_html
+from utils.page_segments import BRAIN_BLOCKS, choose_blocks, render_blocks, segment_html
+from utils.crawler import SiteCrawler
+from utils.copy_scoring import deep_dive_candidates, score_texts, scores_to_rows
+from utils.validators import validation_stats
+from utils.cancellation import (
+    DISCONNECT_SCOPE_KEY,
+    CancelToken,
+    DeadlineExceeded,
+    DisconnectMiddleware,
+    RequestCancelled,
+    cancel_stats,
+    use_token,
+)
+
 # -----------------------
 # INIT BRAINS
 # -----------------------
@@ -54,14 +83,66 @@ section_brain = SectionCopyBrain(OPENAI_API_KEY)
 outreach_brain = OutreachBrain(OPENAI_API_KEY)
 deep_brain = DeepDiveBrain(OPENAI_API_KEY)
 
+# -----------------------
+# AUDIT HISTORY
+# -----------------------
+incremental_deep = IncrementalDeepAudit(deep_brain, AuditHistoryStore())
+
+# -----------------------
+# USAGE LEDGER
+# -----------------------
+usage_ledger.start(float(os.getenv("USAGE_FLUSH_SECONDS", "10")))
+
+# -----------------------
+# CIRCUIT BREAKERS
+# -----------------------
+configure_breakers(os.getenv("BREAKER_CONFIG", ""))
+
+# -----------------------
+# PRIORITY LANES
+# -----------------------
+lanes = build_lanes(
+    int(os.getenv("UPSTREAM_SLOTS", "16")),
+    os.getenv("LANE_CONFIG", ""),
+)
+interactive_lane = lanes["interactive"]
+heavy_lane = lanes["heavy"]
+CRAWL_AUDIT_CONCURRENCY = int(os.getenv("CRAWL_AUDIT_CONCURRENCY", "2"))
+
+# -----------------------
+# PROFILER
+# -----------------------
+profiler = RequestProfiler(
+    sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+    max_files=int(os.getenv("PROFILE_MAX_FILES", "50")),
+)
+
 # -----------------------
 # FASTAPI INIT
 # -----------------------
 app = FastAPI(
     title="Conversion Intelligence API",
     version="1.0.0",
+    default_response_class=FastJSONResponse,
 )
 
+# -----------------------
+# INGRESS FAST PATH
+# -----------------------
+def body_cap(max_chars: int) -> int:
+    # Worst case JSON-escaped astral chars take 12 bytes per char,
+    # so anything validate_size would accept still fits.
+    return max_chars * 12 + 4096
+
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    limits={"/deep-dive": body_cap(12000), "/score": 8_000_000},
+    default_limit=body_cap(5000),
+)
+
+# Added last so it wraps the fast path: early 413s and compressed
+# responses still carry CORS headers
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -82,6 +163,7 @@ def require_master_key(x_master_key: str = Header(None)):
 class LeadGenRequest(BaseModel):
     input_copy: str
     goal: str = "lead_capture"
+    variants: int = 1
 
 class SectionRequest(BaseModel):
     section_copy: str
@@ -90,8 +172,32 @@ class OutreachRequest(BaseModel):
     context_input: str
     channel: str = "email"
 
+class AuditAllRequest(BaseModel):
+    input_copy: str
+    goal: str = "lead_capture"
+    channel: str = "email"
+
+class AuditUrlRequest(BaseModel):
+    url: str
+    brain: str = "deep_dive"
+    goal: str = "lead_capture"
+    channel: str = "email"
+
+class CrawlAuditRequest(BaseModel):
+    url: str
+    brain: str = "deep_dive"
+    max_pages: int = 10
+    max_depth: int = 2
+    goal: str = "lead_capture"
+    channel: str = "email"
+
+class ScoreRequest(BaseModel):
+    texts: List[str]
+    min_friction: float = 40.0
+
 class DeepDiveRequest(BaseModel):
     full_copy: str
+    page_id: Optional[str] = None
 
 # -----------------------
 # REQUEST LOGGER
@@ -108,6 +214,22 @@ async def log_requests(request: Request, call_next):
     )
     return response
 
+# -----------------------
+# REQUEST PROFILER (MASTER KEY ONLY)
+# -----------------------
+def should_profile(headers: dict) -> bool:
+    return (
+        headers.get("x-master-key") == MASTER_KEY
+        and profiler.should_profile(headers.get("x-profile"))
+    )
+
+app.add_middleware(ProfileMiddleware, profiler=profiler, should_profile=should_profile)
+
+# -----------------------
+# DISCONNECT DETECTION (OUTERMOST)
+# -----------------------
+app.add_middleware(DisconnectMiddleware)
+
 # -----------------------
 # ERROR HANDLER
 # -----------------------
@@ -119,6 +241,48 @@ async def global_error_handler(request: Request, exc: Exception):
         content={"detail": "Internal server error"},
     )
 
+# -----------------------
+# DEGRADED FALLBACK
+# -----------------------
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_handler(request: Request, exc: CircuitOpenError):
+    logging.warning(f"{request.url.path} → {str(exc)}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Upstream model unavailable, try again shortly"},
+    )
+
+@app.exception_handler(LaneFullError)
+async def lane_full_handler(request: Request, exc: LaneFullError):
+    logging.warning(f"{request.url.path} → {str(exc)}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server busy, try again shortly"},
+        headers={"Retry-After": "5"},
+    )
+
+@app.exception_handler(RequestCancelled)
+async def cancelled_handler(request: Request, exc: RequestCancelled):
+    cancel_stats.add(requests_cancelled=1)
+    logging.info(f"{request.url.path} → cancelled ({str(exc)})")
+    return JSONResponse(status_code=499, content={"detail": "Request cancelled"})
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_handler(request: Request, exc: DeadlineExceeded):
+    cancel_stats.add(deadlines_exceeded=1)
+    logging.warning(f"{request.url.path} → {str(exc)}")
+    return JSONResponse(status_code=504, content={"detail": "Deadline exceeded"})
+
+def run_or_degrade(call, copy_text: str) -> dict:
+    """
+    Runs a brain call; if its (model, brain) circuit is open and nothing is
+    cached, answers with a local rule-based diagnosis instead.
+    """
+    try:
+        return {"result": call()}
+    except CircuitOpenError:
+        return {"result": rule_based_diagnosis(copy_text), "degraded": True}
+
 # -----------------------
 # HEALTH (NO LOCK)
 # -----------------------
@@ -126,6 +290,65 @@ async def global_error_handler(request: Request, exc: Exception):
 def health():
     return {"status": "ok"}
 
+# -----------------------
+# USAGE (LOCKED)
+# -----------------------
+@app.get("/usage")
+def usage(
+    window_seconds: Optional[int] = None,
+    x_master_key: str = Header(None),
+):
+    require_master_key(x_master_key)
+    return usage_ledger.totals(window_seconds)
+
+# -----------------------
+# CANCELLATIONS (LOCKED)
+# -----------------------
+@app.get("/cancellations")
+def cancellations(x_master_key: str = Header(None)):
+    require_master_key(x_master_key)
+    return cancel_stats.snapshot()
+
+# -----------------------
+# CIRCUITS (LOCKED)
+# -----------------------
+@app.get("/circuits")
+def circuits(x_master_key: str = Header(None)):
+    require_master_key(x_master_key)
+    return breaker_states()
+
+# -----------------------
+# VIOLATIONS (LOCKED)
+# -----------------------
+@app.get("/violations")
+def violations(x_master_key: str = Header(None)):
+    require_master_key(x_master_key)
+    return validation_stats.snapshot()
+
+# -----------------------
+# LANES (LOCKED)
+# -----------------------
+@app.get("/lanes")
+def lane_stats(x_master_key: str = Header(None)):
+    require_master_key(x_master_key)
+    return {name: lane.snapshot() for name, lane in lanes.items()}
+
+# -----------------------
+# PROFILES (LOCKED)
+# -----------------------
+@app.get("/profiles")
+def list_profiles(x_master_key: str = Header(None)):
+    require_master_key(x_master_key)
+    return {"profiles": profiler.list_traces()}
+
+@app.get("/profiles/{name}")
+def get_profile(name: str, x_master_key: str = Header(None)):
+    require_master_key(x_master_key)
+    path = profiler.trace_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=name)
+
 # -----------------------
 # SIZE GUARD
 # -----------------------
@@ -133,54 +356,339 @@ def validate_size(text: str, max_chars=5000):
     if len(text) > max_chars:
         raise HTTPException(status_code=413, detail="Input too large")
 
+# -----------------------
+# CANCELLATION
+# -----------------------
+def request_token(request: Request) -> CancelToken:
+    """
+    Builds the request's cancel token. Clients may send X-Deadline-Ms,
+    a budget in milliseconds that is enforced down to the upstream call.
+    """
+    raw = request.headers.get("x-deadline-ms")
+    try:
+        deadline_ms = float(raw) if raw else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid X-Deadline-Ms")
+    return CancelToken(deadline_ms)
+
+async def run_cancellable(request: Request, lane, fn, *args):
+    """
+    Runs fn in its lane while watching for a client disconnect; a
+    disconnect cancels the token and aborts the in-flight upstream call.
+    """
+    token = request_token(request)
+    disconnected = request.scope[DISCONNECT_SCOPE_KEY]
+
+    async def watch_disconnect():
+        await disconnected.wait()
+        token.cancel("client disconnected")
+
+    watcher = asyncio.create_task(watch_disconnect())
+    try:
+        with use_token(token):
+            return await lane.run(fn, *args)
+    finally:
+        watcher.cancel()
+
 # -----------------------
 # LEADGEN (LOCKED)
 # -----------------------
 @app.post("/leadgen")
-def leadgen(
+async def leadgen(
+    request: Request,
     req: LeadGenRequest,
     x_master_key: str = Header(None),
 ):
     require_master_key(x_master_key)
     validate_size(req.input_copy)
-    return {"result": leadgen_brain.generate(req.input_copy, req.goal)}
+
+    if req.variants == 1:
+        return await run_cancellable(
+            request,
+            interactive_lane,
+            run_or_degrade,
+            lambda: leadgen_brain.generate(req.input_copy, req.goal),
+            req.input_copy,
+        )
+
+    # N candidates from one upstream call, ranked locally
+    if not 2 <= req.variants <= 8:
+        raise HTTPException(status_code=422, detail="variants must be between 1 and 8")
+
+    response = await run_cancellable(
+        request,
+        interactive_lane,
+        run_or_degrade,
+        lambda: leadgen_brain.generate_variants(req.input_copy, req.goal, req.variants),
+        req.input_copy,
+    )
+    if response.get("degraded") or not response["result"]:
+        return response
+    return {"result": response["result"][0]["text"], "variants": response["result"]}
 
 # -----------------------
 # SECTION REWRITE (LOCKED)
 # -----------------------
 @app.post("/section-rewrite")
-def section_rewrite(
+async def section_rewrite(
+    request: Request,
     req: SectionRequest,
     x_master_key: str = Header(None),
 ):
     require_master_key(x_master_key)
     validate_size(req.section_copy)
-    return {"result": section_brain.audit_and_rewrite(req.section_copy)}
+    return await run_cancellable(
+        request,
+        interactive_lane,
+        run_or_degrade,
+        lambda: section_brain.audit_and_rewrite(req.section_copy),
+        req.section_copy,
+    )
 
 # -----------------------
 # OUTREACH (LOCKED)
 # -----------------------
 @app.post("/outreach")
-def outreach(
+async def outreach(
+    request: Request,
     req: OutreachRequest,
     x_master_key: str = Header(None),
 ):
     require_master_key(x_master_key)
     validate_size(req.context_input)
-    return {
-        "result": outreach_brain.generate_outreach(
-            req.context_input, req.channel
-        )
-    }
+    return await run_cancellable(
+        request,
+        interactive_lane,
+        run_or_degrade,
+        lambda: outreach_brain.generate_outreach(req.context_input, req.channel),
+        req.context_input,
+    )
 
 # -----------------------
 # DEEP DIVE (LOCKED)
 # -----------------------
 @app.post("/deep-dive")
-def deep_dive(
+async def deep_dive(
+    request: Request,
     req: DeepDiveRequest,
     x_master_key: str = Header(None),
 ):
     require_master_key(x_master_key)
     validate_size(req.full_copy, 12000)
-    return {"result": deep_brain.deep_audit(req.full_copy)}
\ No newline at end of file
+
+    # Known pages only re-audit the sections that changed
+    if req.page_id:
+        try:
+            return await run_cancellable(
+                request, heavy_lane, incremental_deep.audit, req.page_id, req.full_copy
+            )
+        except CircuitOpenError:
+            return {"result": rule_based_diagnosis(req.full_copy), "degraded": True}
+
+    return await run_cancellable(
+        request,
+        heavy_lane,
+        run_or_degrade,
+        lambda: deep_brain.deep_audit(req.full_copy),
+        req.full_copy,
+    )
+
+# -----------------------
+# AUDIT ALL (LOCKED)
+# -----------------------
+@app.post("/audit-all")
+async def audit_all(
+    request: Request,
+    req: AuditAllRequest,
+    x_master_key: str = Header(None),
+):
+    require_master_key(x_master_key)
+    validate_size(req.input_copy)
+
+    jobs = {
+        "leadgen": (interactive_lane, lambda: leadgen_brain.generate(req.input_copy, req.goal)),
+        "section-rewrite": (interactive_lane, lambda: section_brain.audit_and_rewrite(req.input_copy)),
+        "outreach": (interactive_lane, lambda: outreach_brain.generate_outreach(req.input_copy, req.channel)),
+        "deep-dive": (heavy_lane, lambda: deep_brain.deep_audit(req.input_copy)),
+    }
+
+    async def run(name, lane, call):
+        # One brain failing must not take the others down
+        try:
+            result = await lane.run(run_or_degrade, call, req.input_copy)
+            return {"brain": name, **result}
+        except LaneFullError:
+            return {"brain": name, "error": "Server busy, try again shortly"}
+        except DeadlineExceeded:
+            cancel_stats.add(deadlines_exceeded=1)
+            return {"brain": name, "error": "Deadline exceeded"}
+        except RequestCancelled:
+            return {"brain": name, "error": "Request cancelled"}
+        except ValueError as e:
+            return {"brain": name, "error": str(e)}
+        except Exception as e:
+            logging.error(f"/audit-all {name} → {str(e)}")
+            return {"brain": name, "error": "Internal server error"}
+
+    token = request_token(request)
+
+    async def stream():
+        # Tasks copy the context, so every brain call sees the token
+        with use_token(token):
+            tasks = [asyncio.create_task(run(n, lane, c)) for n, (lane, c) in jobs.items()]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield json.dumps(await next_done) + "\n"
+        finally:
+            # Client went away mid-stream: abort whatever is still running
+            if not all(t.done() for t in tasks):
+                token.cancel("client disconnected")
+                cancel_stats.add(requests_cancelled=1)
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+# -----------------------
+# PAGE AUDIT HELPER
+# -----------------------
+def audit_html(html: str, brain: str, goal: str, channel: str) -> dict:
+    """
+    Segments a page and runs one brain on the blocks it needs,
+    within its token budget.
+    """
+    runners = {
+        "leadgen": lambda text: leadgen_brain.generate(text, goal),
+        "section": lambda text: section_brain.audit_and_rewrite(text),
+        "outreach": lambda text: outreach_brain.generate_outreach(text, channel),
+        "deep_dive": lambda text: deep_brain.deep_audit(text),
+    }
+
+    blocks = segment_html(html)
+    chosen = choose_blocks(blocks, brain)
+    text = render_blocks([chosen[i] for i in sorted(chosen)])
+
+    response = run_or_degrade(lambda: runners[brain](text), text)
+    response["blocks"] = [
+        {
+            "type": b.type,
+            "heading": b.heading,
+            "tokens": b.tokens,
+            "included": i in chosen,
+            "trimmed": i in chosen and chosen[i] is not b,
+        }
+        for i, b in enumerate(blocks)
+    ]
+    return response
+
+# -----------------------
+# AUDIT URL (LOCKED)
+# -----------------------
+@app.post("/audit-url")
+async def audit_url(
+    request: Request,
+    req: AuditUrlRequest,
+    x_master_key: str = Header(None),
+):
+    require_master_key(x_master_key)
+    if req.brain not in BRAIN_BLOCKS:
+        raise HTTPException(status_code=422, detail="Unknown brain")
+
+    def run():
+        return audit_html(fetch_html(req.url), req.brain, req.goal, req.channel)
+
+    lane = heavy_lane if req.brain == "deep_dive" else interactive_lane
+    try:
+        return await run_cancellable(request, lane, run)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+# -----------------------
+# CRAWL AUDIT (LOCKED)
+# -----------------------
+@app.post("/crawl-audit")
+async def crawl_audit(
+    request: Request,
+    req: CrawlAuditRequest,
+    x_master_key: str = Header(None),
+):
+    require_master_key(x_master_key)
+    if req.brain not in BRAIN_BLOCKS:
+        raise HTTPException(status_code=422, detail="Unknown brain")
+    if not 1 <= req.max_pages <= 50 or not 0 <= req.max_depth <= 3:
+        raise HTTPException(status_code=422, detail="Crawl limits out of range")
+
+    try:
+        crawler = SiteCrawler(req.url, max_pages=req.max_pages, max_depth=req.max_depth)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid URL: {e}")
+    # Crawls are batch work whatever the brain: heavy lane, and only a
+    # few pages per crawl in it at once so one crawl can't fill the queue
+    audit_slots = asyncio.Semaphore(CRAWL_AUDIT_CONCURRENCY)
+
+    async def audit_page(page):
+        try:
+            async with audit_slots:
+                result = await heavy_lane.run(audit_html, page.html, req.brain, req.goal, req.channel)
+            return {"url": page.url, "depth": page.depth, **result}
+        except (ValueError, LaneFullError, DeadlineExceeded, RequestCancelled) as e:
+            return {"url": page.url, "depth": page.depth, "error": str(e)}
+        except Exception as e:
+            logging.error(f"/crawl-audit {page.url} → {str(e)}")
+            return {"url": page.url, "depth": page.depth, "error": "Internal server error"}
+
+    token = request_token(request)
+
+    async def stream():
+        # Audits start as pages arrive; lines go out as audits finish
+        finished: asyncio.Queue = asyncio.Queue()
+        pending = 0
+
+        async def crawl():
+            nonlocal pending
+            try:
+                async for page in crawler.crawl():
+                    pending += 1
+                    task = asyncio.create_task(audit_page(page))
+                    task.add_done_callback(
+                        lambda t: t.cancelled() or finished.put_nowait(t.result())
+                    )
+            finally:
+                finished.put_nowait(None)
+
+        with use_token(token):
+            crawl_task = asyncio.create_task(crawl())
+        crawl_done = False
+        try:
+            while not crawl_done or pending:
+                item = await finished.get()
+                if item is None:
+                    crawl_done = True
+                    continue
+                pending -= 1
+                yield json.dumps(item) + "\n"
+            yield json.dumps({"crawl": crawler.stats()}) + "\n"
+        finally:
+            if not crawl_done or pending:
+                token.cancel("client disconnected")
+                cancel_stats.add(requests_cancelled=1)
+            crawl_task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+# -----------------------
+# SCORE (LOCKED)
+# -----------------------
+@app.post("/score")
+def score(
+    req: ScoreRequest,
+    x_master_key: str = Header(None),
+):
+    require_master_key(x_master_key)
+    if len(req.texts) > 10000:
+        raise HTTPException(status_code=413, detail="Too many texts (max 10000)")
+
+    # Model-free triage; candidates are worth sending to /deep-dive
+    scores = score_texts(req.texts)
+    return {
+        "scores": scores_to_rows(scores),
+        "deep_dive_candidates": deep_dive_candidates(scores, req.min_friction).tolist(),
+    }
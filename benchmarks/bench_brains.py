@@ -0,0 +1,131 @@
+"""
+bench_brains.py
+
+Offline performance regression benchmark for the brains.
+Replays recorded upstream completions from a cassette, so runs are
+deterministic and need no network.
+
+    # record once (live API or the local stub server)
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 python -m benchmarks.bench_brains --record
+
+    # replay
+    python -m benchmarks.bench_brains --rounds 50 --max-p50-ms 5
+    python -m benchmarks.bench_brains --paced   # at the recorded latency
+
+Covers the four brains and, when its legacy dependencies are installed,
+the old ForensicCopyAuditor.
+"""
+
+import argparse
+import importlib.util
+import os
+import statistics
+import sys
+import time
+
+from brains.brain_deep_dive import DeepDiveBrain
+from brains.brain_leadgen_copy import LeadGenCopyBrain
+from brains.brain_outreach import OutreachBrain
+from brains.brain_section_copy import SectionCopyBrain
+from utils.openai_client import build_client
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CASSETTE = os.path.join(ROOT, "benchmarks", "cassettes", "brains.json")
+
+SAMPLE_COPY = (
+    "We are an innovative platform designed to streamline your marketing.\n\n"
+    "Our solution helps to transform how teams work together, with seamless "
+    "integrations and robust analytics for growing businesses.\n\n"
+    "Join thousands of happy customers. Start your free trial today."
+)
+
+
+def load_forensic_auditor():
+    """
+    Imports ForensicCopyAuditor from 'old files'. Its sibling module is also
+    called utils, so it is swapped into sys.modules only while loading.
+    """
+    old_dir = os.path.join(ROOT, "old files")
+    saved = sys.modules.get("utils")
+    try:
+        spec = importlib.util.spec_from_file_location("utils", os.path.join(old_dir, "utils.py"))
+        old_utils = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(old_utils)
+        sys.modules["utils"] = old_utils
+
+        spec = importlib.util.spec_from_file_location("legacy_brain_copy", os.path.join(old_dir, "brain_copy.py"))
+        brain_copy = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(brain_copy)
+        return brain_copy.ForensicCopyAuditor
+    except ImportError as e:
+        print(f"skipping ForensicCopyAuditor ({e})", file=sys.stderr)
+        return None
+    finally:
+        sys.modules["utils"] = saved
+
+
+def build_cases(api_key: str) -> dict:
+    leadgen = LeadGenCopyBrain(api_key)
+    section = SectionCopyBrain(api_key)
+    outreach = OutreachBrain(api_key)
+    deep = DeepDiveBrain(api_key)
+
+    cases = {
+        "leadgen": lambda: leadgen.generate(SAMPLE_COPY[:200]),
+        "section": lambda: section.audit_and_rewrite(SAMPLE_COPY),
+        "outreach": lambda: outreach.generate_outreach(SAMPLE_COPY),
+        "deep_dive": lambda: deep.deep_audit(SAMPLE_COPY),
+    }
+
+    ForensicCopyAuditor = load_forensic_auditor()
+    if ForensicCopyAuditor is not None:
+        forensic = ForensicCopyAuditor(api_key)
+        forensic.client = build_client(api_key)
+
+        def run_forensic():
+            result = forensic.audit(SAMPLE_COPY)
+            if result.get("primary_crime") == "Analysis Error":
+                raise RuntimeError(result["logic_reasoning"])
+            return result
+
+        cases["forensic"] = run_forensic
+
+    return cases
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay-based brain benchmark")
+    parser.add_argument("--cassette", default=DEFAULT_CASSETTE)
+    parser.add_argument("--record", action="store_true", help="call upstream and record")
+    parser.add_argument("--paced", action="store_true", help="replay at recorded latency")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--max-p50-ms", type=float, help="fail if any brain's p50 exceeds this")
+    args = parser.parse_args()
+
+    os.environ["OPENAI_CASSETTE"] = args.cassette
+    os.environ["OPENAI_CASSETTE_MODE"] = "record" if args.record else "replay"
+    if args.paced:
+        os.environ["OPENAI_CASSETTE_PACED"] = "1"
+
+    cases = build_cases(os.getenv("OPENAI_API_KEY", "replay"))
+    rounds = 1 if args.record else args.rounds
+
+    failed = False
+    for name, call in cases.items():
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        p50 = statistics.median(timings)
+        p95 = sorted(timings)[int(0.95 * (len(timings) - 1))]
+        over = args.max_p50_ms is not None and p50 > args.max_p50_ms
+        failed = failed or over
+        print(f"{name:<10} p50 {p50:8.2f} ms   p95 {p95:8.2f} ms{'   REGRESSION' if over else ''}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+bench_ingress.py
+
+Micro-benchmark for the ingress fast path.
+
+    python -m benchmarks.bench_ingress
+
+Measures:
+- oversized body rejection vs. full read + JSON parse
+- JSON rendering: standard encoder vs FastJSONResponse
+- gzip / brotli compression cost and ratio on an audit-sized payload
+"""
+
+import asyncio
+import json
+import time
+
+from fastapi.responses import JSONResponse
+
+from utils.ingress import (
+    BodySizeLimitMiddleware,
+    FastJSONResponse,
+    brotli,
+    compress,
+    orjson,
+)
+
+AUDIT_TEXT = (
+    "PRIMARY CONVERSION RISKS:\n"
+    "- The headline describes the product, not the outcome for the buyer.\n"
+    "- Proof is generic and unquantified.\n\n"
+) * 60
+
+
+def bench(label: str, fn, rounds: int = 2000) -> None:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    per_call = (time.perf_counter() - start) / rounds
+    print(f"{label:<44} {per_call * 1e6:>10.1f} µs/op")
+
+
+# -----------------------
+# BODY LIMIT
+# -----------------------
+def oversized_messages(total_bytes: int, chunk: int = 65536):
+    payload = json.dumps({"full_copy": "x" * total_bytes}).encode()
+    parts = [payload[i:i + chunk] for i in range(0, len(payload), chunk)]
+    return [
+        {"type": "http.request", "body": p, "more_body": i < len(parts) - 1}
+        for i, p in enumerate(parts)
+    ]
+
+
+def run_asgi(app, messages):
+    scope = {"type": "http", "method": "POST", "path": "/deep-dive", "headers": []}
+    queue = list(messages)
+
+    async def receive():
+        return queue.pop(0) if queue else {"type": "http.disconnect"}
+
+    async def send(message):
+        pass
+
+    asyncio.run(app(scope, receive, send))
+
+
+async def parsing_app(scope, receive, send):
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    json.loads(b"".join(chunks))
+
+
+def main() -> None:
+    messages = oversized_messages(5_000_000)
+    limited = BodySizeLimitMiddleware(parsing_app, limits={}, default_limit=150_000)
+
+    bench("5 MB body: read + parse (no cap)", lambda: run_asgi(parsing_app, messages), 20)
+    bench("5 MB body: rejected by BodySizeLimit", lambda: run_asgi(limited, messages), 20)
+
+    content = {"result": AUDIT_TEXT, "sections_total": 12, "sections_reaudited": 2}
+    bench("render: JSONResponse", lambda: JSONResponse(content))
+    bench(f"render: FastJSONResponse (orjson={'yes' if orjson else 'no'})", lambda: FastJSONResponse(content))
+
+    body = JSONResponse(content).body
+    encodings = ["gzip"] + (["br"] if brotli is not None else [])
+    for encoding in encodings:
+        ratio = len(compress(body, encoding)) / len(body)
+        bench(f"compress {len(body)} B with {encoding} (ratio {ratio:.2f})", lambda: compress(body, encoding), 500)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,29 @@ Strategic conversion diagnosis for full pages or long sections.
 Focus: revenue leaks, messaging gaps, trust issues, priority fixes.
 """
 
-from openai import OpenAI
+from typing import List, Optional
+
+from utils.openai_client import build_client, create_chat_completion
+from utils.validators import enforce
+
+
+OUTPUT_FORMAT = """OUTPUT FORMAT (STRICT):
+
+PRIMARY CONVERSION RISKS:
+(List the 3–5 most important reasons conversions may be lost)
+
+MESSAGING GAPS:
+(What a serious buyer still does not understand)
+
+TRUST / PROOF WEAKNESSES:
+(Why a buyer might hesitate to believe or commit)
+
+OFFER CLARITY ISSUES:
+(Where the offer feels unclear, risky, or incomplete)
+
+PRIORITY FIX ORDER:
+(What should be fixed first, second, third — based on impact)
+"""
 
 
 class DeepDiveBrain:
@@ -14,7 +36,7 @@ class DeepDiveBrain:
     def __init__(self, api_key: str):
         if not api_key:
             raise ValueError("OpenAI API key required")
-        self.client = OpenAI(api_key=api_key)
+        self.client = build_client(api_key)
 
     def deep_audit(self, full_copy: str) -> str:
 
@@ -47,37 +69,86 @@ COPY TO AUDIT:
 {full_copy}
 ---
 
-OUTPUT FORMAT (STRICT):
+{OUTPUT_FORMAT}"""
+
+        return self._complete(prompt)
+
+    def deep_audit_update(
+        self,
+        changed_sections: List[str],
+        previous_report: str,
+        sections_total: int,
+        removed_sections: Optional[List[str]] = None,
+    ) -> str:
+        """
+        Updates a page-level audit after an edit: only the changed
+        sections are sent, plus the old text of sections that were
+        removed or replaced, with the previous report standing in for
+        the unchanged ones. Returns a full page-level report.
+        """
+
+        changed = "\n\n---\n\n".join(changed_sections) or "(none)"
+        removed = "\n\n---\n\n".join(removed_sections or []) or "(none)"
+        prompt = f"""
+ROLE:
+You are a senior conversion strategist re-auditing a landing page
+after an edit.
 
-PRIMARY CONVERSION RISKS:
-(List the 3–5 most important reasons conversions may be lost)
+CONTEXT:
+You audited this page before. It now has {sections_total} sections;
+{len(changed_sections)} are new or changed and {len(removed_sections or [])} earlier
+sections were removed or replaced. The rest of the page is unchanged
+and is covered by your previous audit below.
 
-MESSAGING GAPS:
-(What a serious buyer still does not understand)
+IMPORTANT RULES:
+- Work ONLY with the previous audit and the sections below
+- Keep findings about unchanged parts unless the new copy affects them
+- Drop findings that rest on removed or replaced text
+- Drop or revise findings the changed sections no longer support
+- Judge the page as a whole, not section by section
+- Do NOT rewrite the page
 
-TRUST / PROOF WEAKNESSES:
-(Why a buyer might hesitate to believe or commit)
+PREVIOUS AUDIT:
+---
+{previous_report}
+---
 
-OFFER CLARITY ISSUES:
-(Where the offer feels unclear, risky, or incomplete)
+REMOVED OR REPLACED SECTIONS (OLD TEXT, NO LONGER ON THE PAGE):
+---
+{removed}
+---
 
-PRIORITY FIX ORDER:
-(What should be fixed first, second, third — based on impact)
-"""
+NEW OR CHANGED SECTIONS (CURRENT TEXT):
+---
+{changed}
+---
 
-        response = self.client.chat.completions.create(
-            model="gpt-4.1",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a calm, senior conversion strategist who diagnoses revenue problems clearly."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            temperature=0.4
-        )
-
-        return response.choices[0].message.content.strip()
+Return the complete, updated audit for the whole page.
+
+{OUTPUT_FORMAT}"""
+
+        return self._complete(prompt)
+
+    def _complete(self, prompt: str) -> str:
+        messages = [
+            {
+                "role": "system",
+                "content": "You are a calm, senior conversion strategist who diagnoses revenue problems clearly."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+
+        def complete(extra: List[dict]) -> str:
+            response = create_chat_completion(
+                self.client,
+                brain="deep_dive",
+                model="gpt-4.1",
+                messages=messages + extra,
+                temperature=0.4
+            )
+            return response.choices[0].message.content.strip()
+
+        return enforce("deep_dive", complete([]), complete)
@@ -6,8 +6,11 @@ Ultra-focused on sharp, uncomfortable, high-conversion micro copy.
 No fluff. No generic hooks.
 """
 
-from openai import OpenAI
-from typing import Optional
+from typing import List, Optional
+
+from utils.copy_rules import dedupe_variants, score_micro_copy, split_micro_copy
+from utils.openai_client import build_client, create_chat_completion
+from utils.validators import enforce, record_output
 
 
 class LeadGenCopyBrain:
@@ -15,16 +18,9 @@ class LeadGenCopyBrain:
     def __init__(self, api_key: str):
         if not api_key:
             raise ValueError("OpenAI API key required")
-        self.client = OpenAI(api_key=api_key)
-
-    def generate(self, input_copy: str, goal: Optional[str] = "lead_capture") -> str:
-        """
-        Generates sharp, conversion-focused micro copy.
-
-        input_copy: short text (5–80 words ideally)
-        goal: lead_capture | click | reply | book_call
-        """
+        self.client = build_client(api_key)
 
+    def _messages(self, input_copy: str) -> List[dict]:
         if not input_copy or len(input_copy.strip()) < 3:
             raise ValueError("Input copy too short.")
 
@@ -76,19 +72,73 @@ WHY THIS WORKS (MAX 1–2 LINES):
 Explain briefly why this forces attention.
 """
 
-        response = self.client.chat.completions.create(
+        return [
+            {
+                "role": "system",
+                "content": "You write elite, uncomfortable conversion micro-copy. Be sharp."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+
+    def generate(self, input_copy: str, goal: Optional[str] = "lead_capture") -> str:
+        """
+        Generates sharp, conversion-focused micro copy.
+
+        input_copy: short text (5–80 words ideally)
+        goal: lead_capture | click | reply | book_call
+        """
+
+        messages = self._messages(input_copy)
+
+        def complete(extra: List[dict]) -> str:
+            response = create_chat_completion(
+                self.client,
+                brain="leadgen",
+                model="gpt-4.1",
+                messages=messages + extra,
+                temperature=0.5
+            )
+            return response.choices[0].message.content.strip()
+
+        return enforce("leadgen", complete([]), complete)
+
+    def generate_variants(
+        self,
+        input_copy: str,
+        goal: Optional[str] = "lead_capture",
+        n: int = 4,
+    ) -> List[dict]:
+        """
+        Generates n candidate blocks in ONE upstream call (multi-choice),
+        drops near-duplicates and ranks the rest locally, best first.
+
+        Each variant: {"copy", "why", "text", "score", "violations"}
+        """
+
+        response = create_chat_completion(
+            self.client,
+            brain="leadgen",
             model="gpt-4.1",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You write elite, uncomfortable conversion micro-copy. Be sharp."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            temperature=0.5
+            messages=self._messages(input_copy),
+            temperature=0.9,
+            n=n
         )
 
-        return response.choices[0].message.content.strip()
\ No newline at end of file
+        variants = []
+        for choice in response.choices:
+            text = (choice.message.content or "").strip()
+            copy, why = split_micro_copy(text)
+            if copy:
+                variants.append({"copy": copy, "why": why, "text": text})
+
+        variants = dedupe_variants(variants)
+        for variant in variants:
+            variant["score"] = score_micro_copy(variant["copy"])
+            # No per-variant retry (that would undo the single call);
+            # rule-breaking variants just rank after clean ones
+            variant["violations"] = record_output("leadgen", variant["text"])
+
+        return sorted(variants, key=lambda v: (not v["violations"], v["score"]), reverse=True)
\ No newline at end of file
@@ -1,4 +1,7 @@
-from openai import OpenAI
+from typing import List
+
+from utils.openai_client import build_client, create_chat_completion
+from utils.validators import enforce
 
 
 class OutreachBrain:
@@ -14,7 +17,7 @@ class OutreachBrain:
     """
 
     def __init__(self, api_key: str):
-        self.client = OpenAI(api_key=api_key)
+        self.client = build_client(api_key)
 
         self.system_prompt = """
 You are a conversion-focused outreach strategist.
@@ -60,13 +63,19 @@ Context:
 Write a short outreach message following the rules exactly.
 """
 
-        response = self.client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": self.system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=0.4,
-        )
-
-        return response.choices[0].message.content.strip()
\ No newline at end of file
+        messages = [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+
+        def complete(extra: List[dict]) -> str:
+            response = create_chat_completion(
+                self.client,
+                brain="outreach",
+                model="gpt-4o-mini",
+                messages=messages + extra,
+                temperature=0.4,
+            )
+            return response.choices[0].message.content.strip()
+
+        return enforce("outreach", complete([]), complete)
\ No newline at end of file
@@ -6,7 +6,10 @@ Focused on improving a specific section of copy for conversions.
 No UI assumptions. No outreach. Rewrite is mandatory.
 """
 
-from openai import OpenAI
+from typing import List
+
+from utils.openai_client import build_client, create_chat_completion
+from utils.validators import enforce
 
 
 class SectionCopyBrain:
@@ -14,7 +17,7 @@ class SectionCopyBrain:
     def __init__(self, api_key: str):
         if not api_key:
             raise ValueError("OpenAI API key required")
-        self.client = OpenAI(api_key=api_key)
+        self.client = build_client(api_key)
 
     def audit_and_rewrite(self, section_copy: str) -> str:
         if not section_copy or len(section_copy.strip()) < 20:
@@ -65,19 +68,25 @@ WHAT’S MISSING / CAN BE IMPROVED:
 - Prioritize proof, specificity, and CTA strength
 """
 
-        response = self.client.chat.completions.create(
-            model="gpt-4.1",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You rewrite copy to increase conversions. You are clear, direct, and practical."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            temperature=0.4
-        )
-
-        return response.choices[0].message.content.strip()
+        messages = [
+            {
+                "role": "system",
+                "content": "You rewrite copy to increase conversions. You are clear, direct, and practical."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+
+        def complete(extra: List[dict]) -> str:
+            response = create_chat_completion(
+                self.client,
+                brain="section",
+                model="gpt-4.1",
+                messages=messages + extra,
+                temperature=0.4
+            )
+            return response.choices[0].message.content.strip()
+
+        return enforce("section", complete([]), complete)
@@ -0,0 +1,218 @@
+"""
+bulk_audit.py
+
+Offline Bulk Audit
+Runs the brains directly over a CSV or JSONL file of inputs with bounded
+concurrency, appending one JSON result per line as each finishes.
+
+The output file doubles as the checkpoint: on restart every id already
+written successfully is skipped, so a crashed run resumes where it stopped.
+
+    python -m scripts.bulk_audit prospects.csv results.jsonl --brain deep_dive -c 8
+
+Input rows need a `text` column (or the brain's own field name, e.g.
+`full_copy`); optional columns: `id`, `brain`, `goal`, `channel`.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterator
+
+from brains.brain_deep_dive import DeepDiveBrain
+from brains.brain_leadgen_copy import LeadGenCopyBrain
+from brains.brain_outreach import OutreachBrain
+from brains.brain_section_copy import SectionCopyBrain
+from utils.usage_ledger import usage_ledger
+
+TEXT_FIELDS = {
+    "leadgen": "input_copy",
+    "section": "section_copy",
+    "outreach": "context_input",
+    "deep_dive": "full_copy",
+}
+
+
+# -----------------------
+# INPUT / CHECKPOINT
+# -----------------------
+def _raw_rows(path: str) -> Iterator[dict]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def read_rows(path: str) -> Iterator[dict]:
+    """
+    Rows with a string id; a missing or empty id becomes the row number.
+    Ids key the checkpoint, so a duplicate is an error.
+    """
+    seen = set()
+    for i, row in enumerate(_raw_rows(path)):
+        row_id = row.get("id")
+        row["id"] = str(i) if row_id is None or str(row_id).strip() == "" else str(row_id)
+        if row["id"] in seen:
+            raise ValueError(f"duplicate id {row['id']!r} in {path} (row {i})")
+        seen.add(row["id"])
+        yield row
+
+
+def completed_ids(output_path: str) -> set:
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn last line from a crash
+            if "result" in record:
+                done.add(str(record["id"]))
+    return done
+
+
+# -----------------------
+# BRAINS
+# -----------------------
+def build_runners(api_key: str) -> Dict[str, callable]:
+    leadgen = LeadGenCopyBrain(api_key)
+    section = SectionCopyBrain(api_key)
+    outreach = OutreachBrain(api_key)
+    deep = DeepDiveBrain(api_key)
+
+    return {
+        "leadgen": lambda text, row: leadgen.generate(text, row.get("goal") or "lead_capture"),
+        "section": lambda text, row: section.audit_and_rewrite(text),
+        "outreach": lambda text, row: outreach.generate_outreach(text, row.get("channel") or "email"),
+        "deep_dive": lambda text, row: deep.deep_audit(text),
+    }
+
+
+def run_row(runners: Dict[str, callable], row: dict, default_brain: str) -> dict:
+    brain = row.get("brain") or default_brain
+    text = row.get(TEXT_FIELDS.get(brain, "")) or row.get("text") or ""
+    start = time.perf_counter()
+
+    record = {"id": row["id"], "brain": brain}
+    try:
+        if brain not in runners:
+            raise ValueError(f"Unknown brain: {brain}")
+        record["result"] = runners[brain](text, row)
+    except Exception as e:
+        record["error"] = str(e)
+
+    record["latency_s"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+# -----------------------
+# PROGRESS
+# -----------------------
+class Progress:
+
+    def __init__(self, total: int, every: float = 5.0):
+        self.total = total
+        self.every = every
+        self.done = 0
+        self.failed = 0
+        self.start = time.perf_counter()
+        self._last = 0.0
+
+    def update(self, record: dict, force: bool = False) -> None:
+        if record is not None:
+            self.done += 1
+            self.failed += 0 if "result" in record else 1
+
+        now = time.perf_counter()
+        if not force and now - self._last < self.every:
+            return
+        self._last = now
+
+        elapsed = max(now - self.start, 1e-9)
+        rate = self.done / elapsed
+        remaining = self.total - self.done
+        eta = remaining / rate if rate > 0 else 0.0
+        print(
+            f"[bulk] {self.done}/{self.total} done, {self.failed} failed | "
+            f"{rate:.2f} rows/s | ETA {eta:.0f}s",
+            file=sys.stderr,
+        )
+
+
+# -----------------------
+# MAIN
+# -----------------------
+def run(input_path: str, output_path: str, brain: str, concurrency: int, api_key: str) -> Progress:
+    done = completed_ids(output_path)
+    pending = [r for r in read_rows(input_path) if r["id"] not in done]
+    if done:
+        print(f"[bulk] resuming: {len(done)} already done", file=sys.stderr)
+
+    runners = build_runners(api_key)
+    progress = Progress(len(pending))
+    write_lock = threading.Lock()
+
+    with open(output_path, "a", encoding="utf-8") as out, \
+            ThreadPoolExecutor(max_workers=concurrency) as pool:
+
+        rows = iter(pending)
+        in_flight = set()
+
+        # Keep at most 2x concurrency rows submitted at any time
+        while True:
+            while len(in_flight) < concurrency * 2:
+                row = next(rows, None)
+                if row is None:
+                    break
+                in_flight.add(pool.submit(run_row, runners, row, brain))
+            if not in_flight:
+                break
+
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                record = future.result()
+                with write_lock:
+                    out.write(json.dumps(record) + "\n")
+                    out.flush()
+                progress.update(record)
+
+    progress.update(None, force=True)
+    usage_ledger.flush()
+    return progress
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk audit a CSV/JSONL file of inputs")
+    parser.add_argument("input", help="CSV or JSONL input file")
+    parser.add_argument("output", help="JSONL results file (also the checkpoint)")
+    parser.add_argument("--brain", default="deep_dive", choices=sorted(TEXT_FIELDS))
+    parser.add_argument("-c", "--concurrency", type=int, default=4)
+    parser.add_argument("--base-url", help="model server, e.g. a local stub at http://127.0.0.1:8765/v1")
+    args = parser.parse_args()
+
+    if args.base_url:
+        os.environ["OPENAI_BASE_URL"] = args.base_url
+
+    api_key = os.getenv("OPENAI_API_KEY") or ("stub" if args.base_url else None)
+    if not api_key:
+        parser.error("OPENAI_API_KEY missing")
+
+    try:
+        progress = run(args.input, args.output, args.brain, args.concurrency, api_key)
+    except ValueError as e:
+        parser.error(str(e))
+    sys.exit(1 if progress.failed else 0)
+
+
+if __name__ == "__main__":
+    main()
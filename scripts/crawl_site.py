@@ -0,0 +1,51 @@
+"""
+crawl_site.py
+
+Crawls a site with SiteCrawler and prints each page as it arrives.
+Handy against a local static server:
+
+    python -m http.server 8000 --directory ./site &
+    python -m scripts.crawl_site http://127.0.0.1:8000/ --max-pages 20 --delay 0
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from utils.crawler import SiteCrawler
+from utils.page_segments import segment_html
+
+
+async def run(args) -> None:
+    crawler = SiteCrawler(
+        args.url,
+        max_pages=args.max_pages,
+        max_depth=args.max_depth,
+        per_host_concurrency=args.concurrency,
+        min_delay=args.delay,
+    )
+    start = time.perf_counter()
+    async for page in crawler.crawl():
+        blocks = segment_html(page.html)
+        print(json.dumps({
+            "url": page.url,
+            "depth": page.depth,
+            "t": round(time.perf_counter() - start, 3),
+            "blocks": [b.type for b in blocks],
+        }))
+    print(json.dumps({"crawl": crawler.stats()}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Crawl a site and list its pages")
+    parser.add_argument("url")
+    parser.add_argument("--max-pages", type=int, default=20)
+    parser.add_argument("--max-depth", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--delay", type=float, default=0.5)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+stub_model_server.py
+
+Local Stand-in Model Server
+Answers /v1/chat/completions with canned, well-formed output so the
+brains, the bulk CLI and benchmarks can run fully offline. Each brain
+gets a reply in its own format that passes its output validators.
+
+    python -m scripts.stub_model_server --port 8765 --latency 0.2
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=stub ...
+"""
+
+import argparse
+import json
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED_DEEP_DIVE = """PRIMARY CONVERSION RISKS:
+- The headline names the product, not the outcome.
+
+MESSAGING GAPS:
+- No clear answer to who this is for.
+
+TRUST / PROOF WEAKNESSES:
+- Claims have no numbers behind them.
+
+OFFER CLARITY ISSUES:
+- The next step is not stated.
+
+PRIORITY FIX ORDER:
+1. Headline 2. Proof 3. CTA"""
+
+CANNED_LEADGEN = """REWRITTEN MICRO COPY:
+Your pricing page hides the one number buyers need.
+Every day it stays hidden, a warm lead books with someone else.
+
+WHY THIS WORKS:
+It names a concrete cost the reader can check in a minute."""
+
+CANNED_SECTION = """WHAT'S HURTING CONVERSIONS:
+- The section lists features but never says what changes for the buyer.
+
+WHY THIS MATTERS:
+- Without an outcome, the reader has no reason to act now.
+
+REWRITTEN SECTION (HIGH-CONVERSION):
+Send invoices that get paid in days, not weeks. Reminders go out on
+their own, so you stop chasing clients. Start your free trial today.
+
+WHAT'S MISSING / CAN BE IMPROVED:
+- One customer number that proves the payment speed."""
+
+CANNED_OUTREACH = """Hi there,
+
+I read your homepage and noticed the headline talks about your platform
+but never says what a customer gets from it. Visitors who land there
+from an ad have a few seconds to decide if the page is for them, and a
+product name alone does not answer that question. Teams in that spot
+usually lose a good share of paid clicks before anyone scrolls to the
+section where the real benefit finally appears. A headline that states
+the outcome, with one number behind it, tends to keep more of those
+people reading. I sketched two alternative headlines for your page.
+Would it be useful if I sent them over?
+
+Best,
+Sam"""
+
+# Picked by a phrase from each brain's system prompt; anything else
+# gets the deep-dive report
+BRAIN_REPLIES = [
+    ("micro-copy", CANNED_LEADGEN),
+    ("You rewrite copy", CANNED_SECTION),
+    ("outreach strategist", CANNED_OUTREACH),
+]
+
+CANNED_JSON_REPLY = json.dumps({
+    "friction_score": 72,
+    "primary_crime": "Jargon Gate",
+    "logic_reasoning": "Stub reply.",
+    "headline_audit": {"current_text": "", "violations": [], "a_list_rewrite": ""},
+    "subhead_audit": {"current_text": "", "violations": [], "a_list_rewrite": ""},
+    "cta_audit": {"current_text": "", "violations": [], "a_list_rewrite": ""},
+})
+
+
+def pick_reply(payload: dict) -> str:
+    if (payload.get("response_format") or {}).get("type") == "json_object":
+        return CANNED_JSON_REPLY
+    system = " ".join(
+        m.get("content", "") for m in payload.get("messages", []) if m.get("role") == "system"
+    )
+    for marker, reply in BRAIN_REPLIES:
+        if marker in system:
+            return reply
+    return CANNED_DEEP_DIVE
+
+
+def make_handler(latency: float):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self.send_error(404)
+                return
+
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            prompt_chars = sum(len(m.get("content", "")) for m in payload.get("messages", []))
+
+            reply = pick_reply(payload)
+            n = int(payload.get("n", 1))
+
+            if payload.get("stream"):
+                self._stream(payload, reply, n, prompt_chars)
+                return
+
+            time.sleep(latency)
+            body = json.dumps({
+                "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": payload.get("model", "stub"),
+                "choices": [
+                    {
+                        "index": i,
+                        "message": {"role": "assistant", "content": reply},
+                        "finish_reason": "stop",
+                    }
+                    for i in range(n)
+                ],
+                "usage": {
+                    "prompt_tokens": prompt_chars // 4,
+                    "completion_tokens": n * len(reply) // 4,
+                    "total_tokens": prompt_chars // 4 + n * len(reply) // 4,
+                },
+            }).encode("utf-8")
+
+            try:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # client gave up or was cancelled
+
+        def _stream(self, payload, reply, n, prompt_chars):
+            # Server-sent events, latency spread evenly across the pieces
+            pieces = [reply[i:i + 40] for i in range(0, len(reply), 40)]
+            base = {
+                "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": payload.get("model", "stub"),
+            }
+
+            def event(data):
+                self.wfile.write(f"data: {data}\n\n".encode("utf-8"))
+                self.wfile.flush()
+
+            try:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+
+                for piece in pieces:
+                    time.sleep(latency / len(pieces))
+                    event(json.dumps({**base, "choices": [
+                        {"index": i, "delta": {"content": piece}, "finish_reason": None}
+                        for i in range(n)
+                    ]}))
+
+                event(json.dumps({**base, "choices": [
+                    {"index": i, "delta": {}, "finish_reason": "stop"} for i in range(n)
+                ]}))
+                if (payload.get("stream_options") or {}).get("include_usage"):
+                    event(json.dumps({**base, "choices": [], "usage": {
+                        "prompt_tokens": prompt_chars // 4,
+                        "completion_tokens": n * len(reply) // 4,
+                        "total_tokens": prompt_chars // 4 + n * len(reply) // 4,
+                    }}))
+                event("[DONE]")
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # client aborted the stream
+
+    return Handler
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765, latency: float = 0.0) -> ThreadingHTTPServer:
+    return ThreadingHTTPServer((host, port), make_handler(latency))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline stand-in for the OpenAI chat API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per completion")
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.latency)
+    print(f"Stub model server on http://{args.host}:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
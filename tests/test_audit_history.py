@@ -0,0 +1,65 @@
+import random
+
+from utils.audit_history import AuditHistoryStore, IncrementalDeepAudit, section_hash, split_sections
+
+WORDS = "you your pricing team page buyer call demo trial results week clients numbers proof leads".split()
+
+
+def make_paragraphs(n: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(15, 30))) + "." for _ in range(n)]
+
+
+class FakeBrain:
+
+    def __init__(self):
+        self.calls = []
+
+    def deep_audit(self, full_copy):
+        self.calls.append(("full",))
+        return "FULL REPORT"
+
+    def deep_audit_update(self, changed, previous_report, sections_total, removed=None):
+        self.calls.append(("update", len(changed), len(removed or [])))
+        return "UPDATED REPORT"
+
+
+def make_audit(tmp_path):
+    brain = FakeBrain()
+    return brain, IncrementalDeepAudit(brain, AuditHistoryStore(str(tmp_path)))
+
+
+def test_edit_keeps_later_section_hashes():
+    paragraphs = make_paragraphs(30)
+    before = {section_hash(s) for s in split_sections("\n\n".join(paragraphs))}
+
+    paragraphs[0] += " Extra words appended here."
+    after = [section_hash(s) for s in split_sections("\n\n".join(paragraphs))]
+
+    assert len(after) > 1
+    assert sum(h not in before for h in after) == 1
+
+
+def test_first_audit_is_one_call_and_unchanged_page_is_free(tmp_path):
+    brain, audit = make_audit(tmp_path)
+    page = "\n\n".join(make_paragraphs(30))
+
+    first = audit.audit("p", page)
+    second = audit.audit("p", page)
+
+    assert brain.calls == [("full",)]
+    assert second["result"] == first["result"] == "FULL REPORT"
+    assert second["sections_reaudited"] == 0
+
+
+def test_removed_section_triggers_update(tmp_path):
+    brain, audit = make_audit(tmp_path)
+    sections = split_sections("\n\n".join(make_paragraphs(90)))
+    assert len(sections) >= 4
+
+    audit.audit("p", "\n\n".join(sections))
+    result = audit.audit("p", "\n\n".join(sections[:1] + sections[2:]))
+
+    assert brain.calls[-1] == ("update", 0, 1)
+    assert result["result"] == "UPDATED REPORT"
+    assert result["sections_removed"] == 1
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.crawler import SiteCrawler
+
+
+def serve(pages):
+    """
+    Local site from {path: html | ("redirect", location)}; anything else is a 404.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            page = pages.get(self.path)
+            if page is None:
+                self.send_response(404)
+                self.end_headers()
+            elif isinstance(page, tuple):
+                self.send_response(302)
+                self.send_header("Location", page[1].format(**ports))
+                self.end_headers()
+            else:
+                body = page.format(**ports).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+ports = {}
+
+SITE = {
+    "/": '<a href="/a">a</a> <a href="/a#top">a again</a> <a href="/dup">dup</a> '
+         '<a href="/away">away</a> <a href="/moved">moved</a> '
+         '<a href="http://127.0.0.1:{other}/">other site</a>',
+    "/a": '<p>page a</p><a href="/a/deep">deep</a>',
+    "/a/deep": '<p>deep</p><a href="/a/deeper">deeper</a>',
+    "/a/deeper": "<p>too deep</p>",
+    "/dup": '<p>page a</p><a href="/a/deep">deep</a>',
+    "/away": ("redirect", "http://127.0.0.1:{other}/landing"),
+    "/moved": ("redirect", "/new-home"),
+    "/new-home": '<p>new home</p><a href="relative">relative</a>',
+    "/relative": "<p>resolved against the final url</p>",
+}
+
+OTHER = {
+    "/": "<p>other site</p>",
+    "/landing": "<p>other landing</p>",
+}
+
+
+@pytest.fixture(scope="module")
+def site():
+    main, other = serve(SITE), serve(OTHER)
+    ports.update(main=main.server_port, other=other.server_port)
+    yield f"http://127.0.0.1:{main.server_port}"
+    main.shutdown()
+    other.shutdown()
+
+
+def crawl(start_url, **options):
+    async def run():
+        crawler = SiteCrawler(start_url, min_delay=0, timeout=5, **options)
+        return [page async for page in crawler.crawl()], crawler
+
+    return asyncio.run(run())
+
+
+def test_crawl_rules(site):
+    pages, crawler = crawl(site + "/", max_pages=20, max_depth=2)
+    paths = sorted(page.url[len(site):] for page in pages)
+
+    # Same site only, including after redirects; depth cap stops /a/deeper;
+    # /dup repeats /a's text; links on a redirected page resolve against it
+    assert paths == ["/", "/a", "/a/deep", "/new-home", "/relative"]
+    assert crawler.duplicates == 1
+    assert all(str(ports["other"]) not in page.url for page in pages)
+    assert {page.url[len(site):]: page.depth for page in pages}["/a/deep"] == 2
+
+
+def test_page_cap(site):
+    pages, crawler = crawl(site + "/", max_pages=3, max_depth=2)
+    assert crawler.fetched == 3
+    assert [page.url[len(site):] for page in pages][:1] == ["/"]
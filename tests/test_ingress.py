@@ -0,0 +1,19 @@
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("MASTER_KEY", "test")
+
+from fastapi.testclient import TestClient
+
+from app import app, body_cap
+
+
+def test_oversized_body_gets_413_with_cors_headers():
+    client = TestClient(app)
+    response = client.post(
+        "/leadgen",
+        content=b"x" * (body_cap(5000) + 1),
+        headers={"Origin": "https://example.com", "Content-Type": "application/json"},
+    )
+    assert response.status_code == 413
+    assert response.headers["access-control-allow-origin"] == "*"
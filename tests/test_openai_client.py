@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import APIStatusError, BadRequestError, InternalServerError
+
+from utils.circuit_breaker import CLOSED, OPEN, get_breaker
+from utils.openai_client import create_chat_completion
+
+
+def failing_client(error_cls, status):
+    response = httpx.Response(status, request=httpx.Request("POST", "http://upstream/v1/chat/completions"))
+
+    def create(**kwargs):
+        raise error_cls("upstream said no", response=response, body=None)
+
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def call_many(client, brain, times=10):
+    for _ in range(times):
+        with pytest.raises(APIStatusError):
+            create_chat_completion(client, brain=brain, model="test-model", messages=[])
+
+
+def test_client_errors_do_not_open_the_circuit():
+    call_many(failing_client(BadRequestError, 400), "breaker_test_4xx")
+    assert get_breaker("test-model", "breaker_test_4xx").state == CLOSED
+
+
+def test_server_errors_open_the_circuit():
+    call_many(failing_client(InternalServerError, 500), "breaker_test_5xx", times=5)
+    assert get_breaker("test-model", "breaker_test_5xx").state == OPEN
+
+
+def test_client_error_releases_half_open_probe():
+    breaker = get_breaker("test-model", "breaker_test_probe")
+    breaker.state, breaker.opened_at = OPEN, 0.0
+
+    call_many(failing_client(BadRequestError, 400), "breaker_test_probe", times=1)
+    assert breaker.allow()
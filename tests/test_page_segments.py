@@ -0,0 +1,51 @@
+import os
+
+from utils.page_segments import choose_blocks, render_blocks, segment_html
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def load(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_div_span_anchor_copy_is_kept():
+    blocks = segment_html(load("div_landing.html"))
+    by_type = {b.type: b for b in blocks}
+
+    assert [b.type for b in blocks] == ["hero", "pricing", "social_proof"]
+    assert "never chase an invoice" in by_type["hero"].text
+    assert "Start free trial" in by_type["hero"].text
+    assert "Starter $19/month" in by_type["pricing"].text
+    assert "billed yearly" in by_type["pricing"].text
+    assert "overdue invoices in half" in by_type["social_proof"].text
+
+
+def test_noise_is_dropped():
+    text = "\n".join(b.text for b in segment_html(load("div_landing.html")))
+
+    assert "Log in" not in text
+    assert "© Acme" not in text
+    assert "Acme Invoicing" not in text
+
+
+def test_semantic_markup_still_splits_on_headings_and_sections():
+    html = """
+    <header><h1>Ship faster</h1><p>Deploys in one click.</p></header>
+    <section id="faq"><h2>Questions</h2><ul><li>Is there a free plan?</li></ul></section>
+    """
+    blocks = segment_html(html)
+
+    assert [(b.type, b.heading) for b in blocks] == [("hero", "Ship faster"), ("faq", "Questions")]
+    assert blocks[1].text == "Questions\nIs there a free plan?"
+
+
+def test_oversized_block_is_trimmed_not_dropped():
+    html = "<h1>Title</h1>" + "".join(f"<div>{'word ' * 60}{i}.</div>" for i in range(20))
+    chosen = choose_blocks(segment_html(html), "leadgen")
+
+    assert len(chosen) == 1
+    block = next(iter(chosen.values()))
+    assert 0 < block.tokens <= 300
+    assert render_blocks([block]).startswith("[HERO]\nTitle")
@@ -0,0 +1,56 @@
+import json
+import os
+import time
+
+from utils.usage_ledger import UsageLedger
+
+
+def test_restart_reloads_aggregates_from_daily_files(tmp_path):
+    path = str(tmp_path / "usage.jsonl")
+    ledger = UsageLedger(path)
+    for _ in range(50):
+        ledger.record("leadgen", "gpt-4.1", prompt_tokens=100, completion_tokens=20, latency_s=0.5)
+    ledger.record("leadgen", "gpt-4.1", latency_s=1.0, ok=False)
+    ledger.flush()
+
+    files = os.listdir(tmp_path)
+    assert files == [time.strftime("usage-%Y%m%d.jsonl", time.gmtime())]
+    # One aggregate row per (minute, brain, model), not one per call
+    assert len((tmp_path / files[0]).read_text().splitlines()) <= 2
+
+    restarted = UsageLedger(path)
+    restarted.load()
+    assert restarted.totals()["totals"] == ledger.totals()["totals"]
+    assert restarted.totals()["totals"]["calls"] == 51
+
+
+def test_files_past_retention_are_deleted_and_not_loaded(tmp_path):
+    path = str(tmp_path / "usage.jsonl")
+    old = tmp_path / "usage-20000101.jsonl"
+    old.write_text(json.dumps({
+        "bucket": 946684800, "brain": "leadgen", "model": "gpt-4.1", "calls": 1, "errors": 0,
+        "prompt_tokens": 1, "completion_tokens": 1, "latency_s": 0.1,
+    }) + "\n")
+
+    ledger = UsageLedger(path)
+    ledger.load()
+    assert ledger.totals()["totals"]["calls"] == 0
+    assert not old.exists()
+
+
+def test_legacy_raw_file_is_migrated(tmp_path):
+    path = tmp_path / "usage.jsonl"
+    entry = {
+        "ts": time.time(), "brain": "outreach", "model": "gpt-4o-mini",
+        "prompt_tokens": 10, "completion_tokens": 5, "latency_s": 0.2, "ok": True,
+    }
+    path.write_text(json.dumps(entry) + "\n" + json.dumps(entry) + "\n")
+
+    ledger = UsageLedger(str(path))
+    ledger.load()
+    assert ledger.totals()["totals"]["calls"] == 2
+    assert not path.exists()
+
+    restarted = UsageLedger(str(path))
+    restarted.load()
+    assert restarted.totals()["totals"]["calls"] == 2
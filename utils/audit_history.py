@@ -0,0 +1,159 @@
+"""
+audit_history.py
+
+Incremental Deep Audit
+Keeps section-level content hashes and the page-level report per page
+so a re-audit only sends the sections that changed to the model.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+FINDING_HEADINGS = [
+    "PRIMARY CONVERSION RISKS",
+    "MESSAGING GAPS",
+    "TRUST / PROOF WEAKNESSES",
+    "OFFER CLARITY ISSUES",
+    "PRIORITY FIX ORDER",
+]
+
+_CUT_DIVISOR = 3
+
+
+def _is_heading(paragraph: str) -> bool:
+    return "\n" not in paragraph and len(paragraph) <= 80 and not paragraph.endswith((".", "!", "?", ","))
+
+
+def split_sections(full_copy: str, min_chars: int = 1500, max_chars: int = 4000) -> List[str]:
+    """
+    Splits copy into sections of whole paragraphs (blank-line separated).
+
+    Cut points are content-defined: once a section holds min_chars, it
+    ends before a heading-like paragraph or after a paragraph whose hash
+    is divisible by _CUT_DIVISOR (forced at max_chars). Boundaries depend
+    on the paragraphs themselves rather than on their position, so an
+    edit moves at most the cut points up to the next content-defined cut
+    and later sections keep their hashes.
+    """
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", full_copy) if p.strip()]
+
+    sections: List[str] = []
+    pending: List[str] = []
+    size = 0
+    for paragraph in paragraphs:
+        if pending and size >= min_chars and _is_heading(paragraph):
+            sections.append("\n\n".join(pending))
+            pending, size = [], 0
+
+        pending.append(paragraph)
+        size += len(paragraph) + 2
+        digest = int(hashlib.sha256(paragraph.encode("utf-8")).hexdigest()[:8], 16)
+        if size >= max_chars or (size >= min_chars and digest % _CUT_DIVISOR == 0):
+            sections.append("\n\n".join(pending))
+            pending, size = [], 0
+
+    if pending:
+        sections.append("\n\n".join(pending))
+
+    return sections
+
+
+def section_hash(text: str) -> str:
+    normalized = " ".join(text.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class AuditHistoryStore:
+    """
+    Sections and the latest report per page, kept in memory and mirrored
+    to one JSON file per page so history survives restarts.
+    """
+
+    def __init__(self, directory: str = "logs/audit_history", max_pages: int = 1000):
+        self.directory = directory
+        self.max_pages = max_pages
+        self._pages: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, page_id: str) -> str:
+        name = hashlib.sha256(page_id.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{name}.json")
+
+    def get(self, page_id: str) -> Optional[dict]:
+        with self._lock:
+            record = self._pages.get(page_id)
+        if record is not None:
+            return record
+
+        path = self._path(page_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        with self._lock:
+            self._pages[page_id] = record
+        return record
+
+    def put(self, page_id: str, record: dict) -> None:
+        with self._lock:
+            self._pages[page_id] = record
+            if len(self._pages) > self.max_pages:
+                oldest = min(self._pages, key=lambda k: self._pages[k]["updated"])
+                del self._pages[oldest]
+
+        tmp_path = self._path(page_id) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(record, f)
+        os.replace(tmp_path, self._path(page_id))
+
+
+class IncrementalDeepAudit:
+    """
+    Keeps one page-level report per page plus its sections. A re-audit
+    sends only the changed sections (and the old text of sections that
+    are gone), with the stored report as context, in a single call that
+    returns an updated page-level report.
+    """
+
+    def __init__(self, brain, store: AuditHistoryStore):
+        self.brain = brain
+        self.store = store
+
+    def audit(self, page_id: str, full_copy: str) -> dict:
+        sections = split_sections(full_copy)
+        hashes = [section_hash(s) for s in sections]
+
+        previous = self.store.get(page_id) or {}
+        report = previous.get("report")
+        old_sections = previous.get("sections") or []
+        old = {section_hash(s): s for s in old_sections if isinstance(s, str)}
+
+        changed = [i for i, h in enumerate(hashes) if h not in old]
+        removed = [text for h, text in old.items() if h not in set(hashes)]
+
+        if report is None or not old or len(changed) == len(sections):
+            changed, removed = list(range(len(sections))), []
+            report = self.brain.deep_audit(full_copy)
+        elif changed or removed:
+            report = self.brain.deep_audit_update(
+                [sections[i] for i in changed], report, len(sections), removed
+            )
+
+        self.store.put(page_id, {"updated": time.time(), "sections": sections, "report": report})
+
+        return {
+            "result": report,
+            "sections_total": len(sections),
+            "sections_reaudited": len(changed),
+            "sections_removed": len(removed),
+        }
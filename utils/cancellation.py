@@ -0,0 +1,144 @@
+"""
+cancellation.py
+
+Cooperative Cancellation
+A CancelToken travels with a request through a ContextVar (threadpool
+hops copy it), carrying the client's deadline and a flag the app sets
+when the client disconnects. create_chat_completion checks it between
+streamed chunks and closes the upstream stream as soon as it fires.
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+
+class RequestCancelled(RuntimeError):
+    """The client went away; nobody will read the result."""
+
+
+class DeadlineExceeded(RuntimeError):
+    """The client's deadline passed before the work finished."""
+
+
+class CancelToken:
+
+    def __init__(self, deadline_ms: Optional[float] = None):
+        self.deadline = time.monotonic() + deadline_ms / 1000 if deadline_ms else None
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+
+    def cancel(self, reason: str = "client disconnected") -> None:
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def remaining(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def raise_if_done(self) -> None:
+        if self.cancelled:
+            raise RequestCancelled(self.reason)
+        remaining = self.remaining()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded("Deadline exceeded")
+
+
+current_token: ContextVar[Optional[CancelToken]] = ContextVar("cancel_token", default=None)
+
+
+@contextmanager
+def use_token(token: CancelToken):
+    reset = current_token.set(token)
+    try:
+        yield token
+    finally:
+        current_token.reset(reset)
+
+
+# -----------------------
+# DISCONNECT DETECTION
+# -----------------------
+DISCONNECT_SCOPE_KEY = "app.disconnected"
+
+
+class DisconnectMiddleware:
+    """
+    Outermost ASGI layer that notices a client disconnect and sets an
+    asyncio.Event in scope[DISCONNECT_SCOPE_KEY].
+
+    Needed because function middlewares (BaseHTTPMiddleware) hide the
+    http.disconnect message from request.is_disconnected().
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        disconnected = asyncio.Event()
+        body_done = asyncio.Event()
+        scope[DISCONNECT_SCOPE_KEY] = disconnected
+
+        async def tracking_receive():
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                disconnected.set()
+            elif not message.get("more_body", False):
+                body_done.set()
+            return message
+
+        async def watch():
+            # Once the body is read, the next message can only be a disconnect
+            await body_done.wait()
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            disconnected.set()
+
+        watcher = asyncio.create_task(watch())
+        try:
+            await self.app(scope, tracking_receive, send)
+        finally:
+            watcher.cancel()
+
+
+# -----------------------
+# COUNTERS
+# -----------------------
+class CancelStats:
+
+    def __init__(self):
+        self.requests_cancelled = 0
+        self.deadlines_exceeded = 0
+        self.upstream_calls_aborted = 0
+        self.chunks_discarded = 0
+        self._lock = threading.Lock()
+
+    def add(self, **counts) -> None:
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "requests_cancelled": self.requests_cancelled,
+                "deadlines_exceeded": self.deadlines_exceeded,
+                "upstream_calls_aborted": self.upstream_calls_aborted,
+                "chunks_discarded": self.chunks_discarded,
+            }
+
+
+cancel_stats = CancelStats()
@@ -0,0 +1,170 @@
+"""
+cassette.py
+
+Record / Replay Transport
+An httpx transport for the OpenAI client. Record mode forwards each
+request upstream and stores the request/response pair, including every
+raw body chunk and its arrival time, in a JSON cassette. Replay mode
+serves the stored responses back without touching the network,
+optionally at the recorded pace.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+RECORD = "record"
+REPLAY = "replay"
+
+
+def request_key(request: httpx.Request) -> str:
+    """
+    Identifies a request by method, path and canonical JSON body.
+    Headers are ignored (auth, SDK retry counters, user agents).
+    """
+    body = request.content or b""
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True).encode("utf-8")
+    except ValueError:
+        pass
+    raw = request.method.encode() + b" " + request.url.path.encode() + b"\n" + body
+    return hashlib.sha256(raw).hexdigest()
+
+
+class _ReplayStream(httpx.SyncByteStream):
+
+    def __init__(self, chunks: List[dict], started: float, paced: bool):
+        self.chunks = chunks
+        self.started = started
+        self.paced = paced
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            if self.paced:
+                delay = chunk["t"] - (time.perf_counter() - self.started)
+                if delay > 0:
+                    time.sleep(delay)
+            yield base64.b64decode(chunk["data"])
+
+
+class CassetteTransport(httpx.BaseTransport):
+
+    def __init__(
+        self,
+        path: str,
+        mode: str = REPLAY,
+        paced: bool = False,
+        inner: Optional[httpx.BaseTransport] = None,
+    ):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+
+        self.path = path
+        self.mode = mode
+        self.paced = paced
+        self.inner = inner or httpx.HTTPTransport()
+
+        self._entries: Dict[str, List[dict]] = {}
+        self._replay_cursor: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for entry in json.load(f)["interactions"]:
+                    self._entries.setdefault(entry["key"], []).append(entry)
+
+    # -----------------------
+    # REPLAY
+    # -----------------------
+    def _replay(self, request: httpx.Request, key: str) -> httpx.Response:
+        started = time.perf_counter()
+        with self._lock:
+            entries = self._entries.get(key)
+            if entries:
+                # Repeated identical requests cycle through what was recorded
+                index = self._replay_cursor.get(key, 0)
+                self._replay_cursor[key] = index + 1
+                entry = entries[index % len(entries)]
+
+        if not entries:
+            body = json.dumps({
+                "error": {"message": f"No cassette entry for request {key[:12]}", "type": "cassette_miss"}
+            }).encode("utf-8")
+            return httpx.Response(404, headers={"content-type": "application/json"}, content=body, request=request)
+
+        response = entry["response"]
+        return httpx.Response(
+            response["status"],
+            headers=response["headers"],
+            stream=_ReplayStream(response["chunks"], started, self.paced),
+            request=request,
+        )
+
+    # -----------------------
+    # RECORD
+    # -----------------------
+    def _record(self, request: httpx.Request, key: str) -> httpx.Response:
+        started = time.perf_counter()
+        upstream = self.inner.handle_request(request)
+
+        chunks = []
+        for data in upstream.stream:
+            chunks.append({
+                "t": round(time.perf_counter() - started, 4),
+                "data": base64.b64encode(data).decode("ascii"),
+            })
+        upstream.close()
+
+        entry = {
+            "key": key,
+            "request": {
+                "method": request.method,
+                "url": str(request.url),
+                "body": (request.content or b"").decode("utf-8", "replace"),
+            },
+            "response": {
+                "status": upstream.status_code,
+                "headers": [
+                    [k, v] for k, v in upstream.headers.multi_items()
+                    if k.lower() not in ("set-cookie", "openai-organization")
+                ],
+                "chunks": chunks,
+            },
+        }
+
+        with self._lock:
+            self._entries.setdefault(key, []).append(entry)
+            self._save()
+
+        return httpx.Response(
+            upstream.status_code,
+            headers=upstream.headers,
+            stream=_ReplayStream(chunks, started, paced=False),
+            request=request,
+        )
+
+    def _save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        interactions = [e for entries in self._entries.values() for e in entries]
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"interactions": interactions}, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        key = request_key(request)
+        if self.mode == REPLAY:
+            return self._replay(request, key)
+        return self._record(request, key)
+
+    def close(self) -> None:
+        self.inner.close()
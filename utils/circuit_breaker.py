@@ -0,0 +1,160 @@
+"""
+circuit_breaker.py
+
+Per-model, per-brain Circuit Breaker
+One breaker per (model, brain), so a brain whose calls are slow by
+design cannot trip the model for the others. Opens when the rolling
+error rate or slow-call rate crosses a threshold,
+fails fast while open, and lets a single probe through after a cool-down
+to decide whether the upstream has recovered.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from typing import Dict
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is rejected because the circuit is open."""
+
+
+class CircuitBreaker:
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = 60.0,
+        min_calls: int = 5,
+        error_rate: float = 0.5,
+        slow_call_seconds: float = 30.0,
+        slow_call_rate: float = 0.5,
+        open_seconds: float = 30.0,
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._calls: deque = deque()  # (ts, ok, slow)
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float) -> None:
+        while self._calls and self._calls[0][0] < now - self.window_seconds:
+            self._calls.popleft()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.open_seconds:
+                    return False
+                self.state = HALF_OPEN
+
+            # Half-open: exactly one probe at a time
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record(self, ok: bool, latency_s: float) -> None:
+        now = time.monotonic()
+        slow = latency_s >= self.slow_call_seconds
+
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                if ok and not slow:
+                    self.state = CLOSED
+                    self._calls.clear()
+                else:
+                    self.state = OPEN
+                    self.opened_at = now
+                return
+
+            self._calls.append((now, ok, slow))
+            self._prune(now)
+
+            total = len(self._calls)
+            if total < self.min_calls:
+                return
+
+            errors = sum(1 for _, call_ok, _ in self._calls if not call_ok)
+            slows = sum(1 for _, _, call_slow in self._calls if call_slow)
+            if errors / total >= self.error_rate or slows / total >= self.slow_call_rate:
+                self.state = OPEN
+                self.opened_at = now
+
+    def abandon(self) -> None:
+        """
+        Releases a half-open probe whose call ended without saying anything
+        about upstream health (cancelled by our side, or a client error),
+        so the next call can probe instead.
+        """
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            self._prune(time.monotonic())
+            return {
+                "state": self.state,
+                "calls_in_window": len(self._calls),
+                "errors_in_window": sum(1 for _, ok, _ in self._calls if not ok),
+                "slow_in_window": sum(1 for _, _, slow in self._calls if slow),
+            }
+
+
+# Slow-call thresholds follow each brain's normal latency: a 30s deep
+# audit is healthy, a 30s leadgen call is not
+DEFAULT_BREAKER_CONFIG = {
+    "leadgen": {"slow_call_seconds": 20.0},
+    "section": {"slow_call_seconds": 30.0},
+    "outreach": {"slow_call_seconds": 20.0},
+    "deep_dive": {"slow_call_seconds": 90.0},
+}
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_config: Dict[str, dict] = {name: dict(values) for name, values in DEFAULT_BREAKER_CONFIG.items()}
+_registry_lock = threading.Lock()
+
+
+def configure_breakers(config_json: str = "") -> None:
+    """
+    Merges an optional JSON config into DEFAULT_BREAKER_CONFIG, keyed by
+    brain, e.g. {"deep_dive": {"slow_call_seconds": 120}}. A "*" entry
+    applies to every brain. Only affects breakers created afterwards.
+    """
+    with _registry_lock:
+        for brain, values in (json.loads(config_json) if config_json else {}).items():
+            _config.setdefault(brain, {}).update(values)
+
+
+def get_breaker(model: str, brain: str) -> CircuitBreaker:
+    name = f"{model}:{brain}"
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _registry_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                options = {**_config.get("*", {}), **_config.get(brain, {})}
+                breaker = _breakers[name] = CircuitBreaker(name, **options)
+    return breaker
+
+
+def breaker_states() -> Dict[str, dict]:
+    return {name: b.snapshot() for name, b in list(_breakers.items())}
@@ -0,0 +1,172 @@
+"""
+copy_rules.py
+
+Local Copy Rules
+The gates from the Forensic Copy Auditor prompt (we-centric, passive,
+jargon, banned words) as plain word lists, plus a rule-based diagnosis
+used when the upstream model is unavailable and a cheap scorer for
+ranking micro copy variants.
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+WE_WORDS = ["we", "our", "ours", "us", "i", "my"]
+YOU_WORDS = ["you", "your", "yours"]
+
+PASSIVE_PHRASES = [
+    "is designed to", "are designed to", "helps to", "help to",
+    "is built to", "are built to", "is intended to", "can be used to",
+]
+
+JARGON_WORDS = [
+    "synergy", "solution", "solutions", "transform", "leverage",
+    "seamless", "innovative", "cutting-edge", "robust", "holistic",
+]
+
+BANNED_WORDS = [
+    "boost", "elevate", "unlock", "unleash", "master", "impact",
+    "empower", "streamline", "discover",
+]
+
+CTA_VERBS = [
+    "get", "start", "try", "join", "book", "sign", "buy",
+    "demo", "talk", "contact", "claim", "request",
+]
+
+_WORD_RE = re.compile(r"[a-z][a-z'\-]*")
+_SENTENCE_RE = re.compile(r"[.!?]+(?:\s|$)")
+
+
+def find_hits(text: str, words: List[str]) -> List[str]:
+    tokens = set(_WORD_RE.findall(text.lower()))
+    return [w for w in words if w in tokens]
+
+
+def find_phrases(text: str, phrases: List[str]) -> List[str]:
+    lowered = text.lower()
+    return [p for p in phrases if p in lowered]
+
+
+def rule_based_checks(text: str) -> Dict[str, object]:
+    tokens = _WORD_RE.findall(text.lower())
+    sentences = [s for s in _SENTENCE_RE.split(text) if s.strip()]
+
+    return {
+        "words": len(tokens),
+        "we_count": sum(1 for t in tokens if t in WE_WORDS),
+        "you_count": sum(1 for t in tokens if t in YOU_WORDS),
+        "passive": find_phrases(text, PASSIVE_PHRASES),
+        "jargon": find_hits(text, JARGON_WORDS),
+        "banned": find_hits(text, BANNED_WORDS),
+        "has_numbers": bool(re.search(r"\d", text)),
+        "has_cta": bool(find_hits(text, CTA_VERBS)),
+        "avg_sentence_words": round(len(tokens) / max(len(sentences), 1), 1),
+    }
+
+
+def rule_based_diagnosis(text: str) -> str:
+    """
+    A local, model-free diagnosis in the deep audit's report shape.
+    """
+    c = rule_based_checks(text)
+
+    risks = []
+    if c["we_count"] > c["you_count"]:
+        risks.append(
+            f"- Seller-focused: {c['we_count']} we/our mentions vs "
+            f"{c['you_count']} you/your"
+        )
+    if c["passive"]:
+        risks.append("- Weak, passive phrasing: " + ", ".join(f'"{p}"' for p in c["passive"]))
+    if c["jargon"]:
+        risks.append("- Jargon adds noise: " + ", ".join(c["jargon"]))
+    if c["banned"]:
+        risks.append("- Hype words weaken credibility: " + ", ".join(c["banned"]))
+    if c["avg_sentence_words"] > 25:
+        risks.append(f"- Long sentences (avg {c['avg_sentence_words']} words) slow comprehension")
+
+    trust = ["- No numbers, results, or specifics to back the claims"] if not c["has_numbers"] else []
+    offer = ["- No clear call to action verb found"] if not c["has_cta"] else []
+
+    return "\n\n".join([
+        "DEGRADED MODE — RULE-BASED DIAGNOSIS (model unavailable)",
+        "PRIMARY CONVERSION RISKS:\n" + ("\n".join(risks) or "- No rule-based issues found"),
+        "TRUST / PROOF WEAKNESSES:\n" + ("\n".join(trust) or "-"),
+        "OFFER CLARITY ISSUES:\n" + ("\n".join(offer) or "-"),
+    ])
+
+
+# -----------------------
+# MICRO COPY VARIANTS
+# -----------------------
+HYPE_WORDS = [
+    "amazing", "revolutionary", "ultimate", "game-changing", "incredible",
+    "best", "powerful", "effortless", "skyrocket", "supercharge",
+]
+
+_MICRO_COPY_RE = re.compile(
+    r"REWRITTEN MICRO COPY:\s*(.*?)(?:\n\s*WHY THIS WORKS[^\n]*:\s*(.*))?$",
+    re.S | re.I,
+)
+
+
+def split_micro_copy(text: str) -> Tuple[str, str]:
+    """
+    Splits a leadgen block into (micro copy, why it works).
+    Unstructured output is treated as all copy.
+    """
+    match = _MICRO_COPY_RE.search(text)
+    if not match:
+        return text.strip(), ""
+    return match.group(1).strip(), (match.group(2) or "").strip()
+
+
+def _token_set(text: str) -> set:
+    return set(_WORD_RE.findall(text.lower()))
+
+
+def dedupe_variants(variants: List[dict], threshold: float = 0.8) -> List[dict]:
+    """
+    Drops variants whose copy shares >= threshold of its words
+    (Jaccard) with an earlier one.
+    """
+    kept, kept_tokens = [], []
+    for variant in variants:
+        tokens = _token_set(variant["copy"])
+        if any(
+            len(tokens & other) / max(len(tokens | other), 1) >= threshold
+            for other in kept_tokens
+        ):
+            continue
+        kept.append(variant)
+        kept_tokens.append(tokens)
+    return kept
+
+
+def score_micro_copy(copy: str) -> float:
+    """
+    Cheap local ranking score, higher is better. Rewards reader focus,
+    concrete specifics and tight lines; penalises the banned, hype,
+    jargon and passive patterns the prompt forbids.
+    """
+    c = rule_based_checks(copy)
+    lines = [l for l in copy.splitlines() if l.strip()]
+
+    score = 0.0
+    score += min(c["you_count"], 4) * 1.0
+    score -= c["we_count"] * 1.0
+    score += 2.0 if c["has_numbers"] else 0.0
+    score -= 3.0 * len(c["banned"])
+    score -= 2.0 * len(c["jargon"])
+    score -= 2.0 * len(c["passive"])
+    score -= 1.5 * len(find_hits(copy, HYPE_WORDS))
+
+    # 2–3 lines of 5–20 words is the brief
+    score -= abs(len(lines) - 2.5) if lines else 5.0
+    for line in lines:
+        words = len(_WORD_RE.findall(line.lower()))
+        if words < 5 or words > 20:
+            score -= 1.0
+
+    return round(score, 2)
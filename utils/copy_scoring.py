@@ -0,0 +1,238 @@
+"""
+copy_scoring.py
+
+Vectorized Copy Scoring
+LLM-free triage for large batches of copy: readability, sentence length,
+we/you focus, passive voice, jargon and banned-word density (the
+Forensic Copy Auditor gates). The whole batch is tokenized at the byte
+level into integer arrays (token boundaries, hashed token ids) and every
+metric is computed with NumPy; Python only touches unique tokens.
+"""
+
+import re
+from typing import Dict, List
+
+import numpy as np
+
+from utils.copy_rules import BANNED_WORDS, JARGON_WORDS, WE_WORDS, YOU_WORDS
+
+DOC_SEP = "\x1e"  # ASCII record separator
+_VOWEL_GROUPS_RE = re.compile(r"[aeiouy]+")
+
+BE_WORDS = {"is", "are", "was", "were", "be", "been", "being"}
+HELP_WORDS = {"help", "helps", "helped"}
+IRREGULAR_PARTICIPLES = {
+    "built", "made", "done", "given", "known", "shown", "seen", "taken",
+    "written", "driven", "chosen", "held", "kept", "left", "sent", "set",
+}
+
+METRICS = [
+    "words", "sentences", "avg_sentence_words", "reading_ease",
+    "we_count", "you_count", "we_share",
+    "passive_density", "jargon_density", "banned_density", "friction_score",
+]
+
+
+def _syllables(word: str) -> int:
+    count = len(_VOWEL_GROUPS_RE.findall(word))
+    if word.endswith("e") and not word.endswith(("le", "ee")) and count > 1:
+        count -= 1
+    return max(count, 1)
+
+
+# Byte classes: 0 other, 1 word char, 2 sentence end, 3 doc separator
+_BYTE_CLASS = np.zeros(256, dtype=np.uint8)
+_BYTE_CLASS[np.frombuffer(b"abcdefghijklmnopqrstuvwxyz'-", dtype=np.uint8)] = 1
+_BYTE_CLASS[np.frombuffer(b".!?", dtype=np.uint8)] = 2
+_BYTE_CLASS[ord(DOC_SEP)] = 3
+
+_HASH_MULT = np.uint64(1099511628211)
+_PAD = 16
+
+
+def _masked_word(words64: np.ndarray, positions: np.ndarray, n_bytes: np.ndarray) -> np.ndarray:
+    """
+    Unaligned 8-byte little-endian loads, keeping only the low n_bytes
+    (clipped to 0..8) bytes.
+    """
+    n_bytes = np.clip(n_bytes, 0, 8).astype(np.uint64)
+    keep = np.where(
+        n_bytes == 8,
+        np.uint64(0xFFFFFFFFFFFFFFFF),
+        (np.uint64(1) << (n_bytes * np.uint64(8))) - np.uint64(1),
+    )
+    return words64[positions] & keep
+
+
+def tokenize(texts: List[str]):
+    """
+    Tokenizes a batch in one pass.
+
+    Returns (raw bytes, token starts, token ends, token hashes); a doc
+    separator token sits between consecutive documents (DOC_SEP inside a
+    text is replaced by a space). The 64-bit hash mixes the length, the
+    first 16 bytes and the last 8 bytes; it is not collision-free, but
+    two distinct tokens in one batch sharing a hash is very unlikely
+    (and would only merge their vocabulary features).
+    """
+    # A separator inside a text would shift every later doc onto the wrong row
+    raw = DOC_SEP.join(t.replace(DOC_SEP, " ") for t in texts).lower().encode("utf-8")
+    data = np.frombuffer(raw, dtype=np.uint8)
+    cls = _BYTE_CLASS[data]
+
+    # Decimal points ("3.5") do not end a sentence
+    is_digit = (data >= ord("0")) & (data <= ord("9"))
+    decimal = data[1:-1] == ord(".")
+    decimal &= is_digit[:-2] & is_digit[2:]
+    cls[1:-1][decimal] = 0
+
+    prev = np.zeros_like(cls)
+    prev[1:] = cls[:-1]
+    nxt = np.zeros_like(cls)
+    nxt[:-1] = cls[1:]
+
+    active = cls != 0
+    starts = np.flatnonzero(active & ((cls != prev) | (cls == 3)))
+    ends = np.flatnonzero(active & ((cls != nxt) | (cls == 3))) + 1
+    if len(starts) == 0:
+        return raw, starts, ends, np.zeros(0, dtype=np.uint64)
+
+    # Overlapping 8-byte view: words64[i] is bytes i..i+7
+    padded = raw + bytes(_PAD)
+    words64 = np.ndarray(len(raw) + _PAD - 7, dtype="<u8", buffer=padded, strides=(1,))
+
+    lengths = ends - starts
+    tail_start = np.maximum(ends - 8, starts)
+    with np.errstate(over="ignore"):
+        hashes = lengths.astype(np.uint64)
+        hashes = hashes * _HASH_MULT ^ _masked_word(words64, starts, lengths)
+        hashes = hashes * _HASH_MULT ^ _masked_word(words64, starts + 8, lengths - 8)
+        hashes = hashes * _HASH_MULT ^ _masked_word(words64, tail_start, np.where(lengths > 16, 8, 0))
+
+    return raw, starts, ends, hashes
+
+
+def _vocab_features(words: List[str]) -> Dict[str, np.ndarray]:
+    """
+    Per-vocabulary-entry features. Only this step loops in Python, and
+    only over unique tokens.
+    """
+    words = [w if w == DOC_SEP else w.strip("'-") or "-" for w in words]
+    we, you = set(WE_WORDS), set(YOU_WORDS)
+    banned, jargon = set(BANNED_WORDS), set(JARGON_WORDS)
+
+    def flags(predicate):
+        return np.fromiter((predicate(w) for w in words), dtype=bool, count=len(words))
+
+    return {
+        "is_sep": flags(lambda w: w == DOC_SEP),
+        "is_end": flags(lambda w: w[0] in ".!?"),
+        "is_word": flags(lambda w: w[0].isalpha()),
+        "syllables": np.fromiter(
+            (_syllables(w) if w[0].isalpha() else 0 for w in words), dtype=np.int32, count=len(words)
+        ),
+        "is_we": flags(lambda w: w in we),
+        "is_you": flags(lambda w: w in you),
+        "is_banned": flags(lambda w: w in banned),
+        "is_jargon": flags(lambda w: w in jargon),
+        "is_be": flags(lambda w: w in BE_WORDS),
+        "is_help": flags(lambda w: w in HELP_WORDS),
+        "is_to": flags(lambda w: w == "to"),
+        "is_participle": flags(lambda w: (len(w) > 4 and w.endswith("ed")) or w in IRREGULAR_PARTICIPLES),
+    }
+
+
+def score_texts(texts: List[str]) -> Dict[str, np.ndarray]:
+    """
+    Scores a batch of texts. Returns one array per metric, aligned
+    with the input order.
+
+    friction_score is 0-100, higher means more copy problems (and more
+    worth a /deep-dive).
+    """
+    n_docs = len(texts)
+    if n_docs == 0:
+        return {name: np.zeros(0) for name in METRICS}
+
+    raw, starts, ends, hashes = tokenize(texts)
+    if len(starts) == 0:
+        return {name: np.zeros(n_docs) for name in METRICS}
+
+    _, first, ids = np.unique(hashes, return_index=True, return_inverse=True)
+    vocab = [raw[starts[i]:ends[i]].decode("utf-8", "ignore") for i in first]
+    f = {name: values[ids] for name, values in _vocab_features(vocab).items()}
+
+    doc = np.cumsum(f["is_sep"])
+
+    def per_doc(mask_or_weights) -> np.ndarray:
+        return np.bincount(doc, weights=mask_or_weights.astype(np.float64), minlength=n_docs)[:n_docs]
+
+    # Two-token patterns, only within one document
+    same_doc = np.zeros_like(f["is_sep"])
+    same_doc[:-1] = doc[:-1] == doc[1:]
+    next_participle = np.zeros_like(f["is_sep"])
+    next_participle[:-1] = f["is_participle"][1:]
+    next_to = np.zeros_like(f["is_sep"])
+    next_to[:-1] = f["is_to"][1:]
+    passive = same_doc & ((f["is_be"] & next_participle) | (f["is_help"] & next_to))
+
+    words = per_doc(f["is_word"])
+    sentences = np.maximum(per_doc(f["is_end"]), 1.0)
+    syllables = per_doc(f["syllables"])
+    we = per_doc(f["is_we"])
+    you = per_doc(f["is_you"])
+
+    safe_words = np.maximum(words, 1.0)
+    avg_sentence = words / sentences
+    reading_ease = 206.835 - 1.015 * avg_sentence - 84.6 * (syllables / safe_words)
+    we_share = np.divide(we, we + you, out=np.zeros(n_docs), where=(we + you) > 0)
+    passive_density = per_doc(passive) / sentences
+    jargon_density = per_doc(f["is_jargon"]) / safe_words
+    banned_density = per_doc(f["is_banned"]) / safe_words
+
+    friction = 100 * np.clip(
+        0.25 * we_share
+        + 0.20 * np.minimum(passive_density * 2, 1)
+        + 0.20 * np.minimum(jargon_density * 20, 1)
+        + 0.15 * np.minimum(banned_density * 20, 1)
+        + 0.20 * np.clip((avg_sentence - 15) / 20, 0, 1),
+        0,
+        1,
+    )
+    friction[words == 0] = 0
+
+    return {
+        "words": words.astype(np.int64),
+        "sentences": sentences.astype(np.int64),
+        "avg_sentence_words": avg_sentence,
+        "reading_ease": np.where(words > 0, reading_ease, 0.0),
+        "we_count": we.astype(np.int64),
+        "you_count": you.astype(np.int64),
+        "we_share": we_share,
+        "passive_density": passive_density,
+        "jargon_density": jargon_density,
+        "banned_density": banned_density,
+        "friction_score": friction,
+    }
+
+
+def deep_dive_candidates(
+    scores: Dict[str, np.ndarray],
+    min_friction: float = 40.0,
+    min_words: int = 20,
+) -> np.ndarray:
+    """
+    Indices worth a model call, highest friction first.
+    """
+    mask = (scores["friction_score"] >= min_friction) & (scores["words"] >= min_words)
+    indices = np.flatnonzero(mask)
+    return indices[np.argsort(-scores["friction_score"][indices], kind="stable")]
+
+
+def scores_to_rows(scores: Dict[str, np.ndarray]) -> List[dict]:
+    columns = {
+        name: np.round(values, 3).tolist() if values.dtype.kind == "f" else values.tolist()
+        for name, values in scores.items()
+    }
+    n = len(next(iter(columns.values()))) if columns else 0
+    return [{name: columns[name][i] for name in columns} for i in range(n)]
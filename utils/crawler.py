@@ -0,0 +1,205 @@
+"""
+crawler.py
+
+Async Site Crawler
+Breadth-first crawl of one site for whole-funnel audits: an async
+frontier, per-host concurrency and delay limits, robots.txt, same-domain
+links only, a depth and page cap, and dedupe by content hash. Pages are
+yielded as soon as they are fetched.
+"""
+
+import asyncio
+import hashlib
+import re
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urldefrag, urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+
+import httpx
+from bs4 import BeautifulSoup
+
+from utils.helpers import USER_AGENT, normalize_url
+
+SKIP_EXTENSIONS = re.compile(
+    r"\.(png|jpe?g|gif|svg|webp|ico|pdf|zip|gz|mp4|mp3|webm|css|js|json|xml|woff2?|ttf)$", re.I
+)
+
+
+@dataclass
+class CrawledPage:
+    url: str
+    depth: int
+    html: str
+    content_hash: str
+
+
+def _host(url: str) -> str:
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def parse_page(html: str, base_url: str) -> Tuple[str, List[str]]:
+    """
+    One parse per page: returns (content hash, same-scheme links).
+    CPU-bound on large pages, so the crawler runs it in a thread.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+
+    text = " ".join(soup.get_text(" ").split())
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    links = []
+    for a in soup.find_all("a", href=True):
+        url, _ = urldefrag(urljoin(base_url, a["href"].strip()))
+        if url.startswith(("http://", "https://")) and not SKIP_EXTENSIONS.search(urlparse(url).path):
+            links.append(url)
+    return digest, links
+
+
+class SiteCrawler:
+
+    def __init__(
+        self,
+        start_url: str,
+        max_pages: int = 20,
+        max_depth: int = 2,
+        per_host_concurrency: int = 2,
+        min_delay: float = 0.5,
+        timeout: float = 15.0,
+        max_bytes: int = 3_000_000,
+    ):
+        self.start_url = normalize_url(start_url)
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.per_host_concurrency = per_host_concurrency
+        self.min_delay = min_delay
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+
+        self.site = _host(self.start_url)
+        self.fetched = 0
+        self.duplicates = 0
+        self.errors = 0
+
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self._host_next_at: Dict[str, float] = {}
+        self._robots: Optional[RobotFileParser] = None
+
+    # -----------------------
+    # POLITENESS
+    # -----------------------
+    async def _load_robots(self, client: httpx.AsyncClient) -> None:
+        parsed = urlparse(self.start_url)
+        robots = RobotFileParser()
+        try:
+            response = await client.get(f"{parsed.scheme}://{parsed.netloc}/robots.txt")
+            robots.parse(response.text.splitlines() if response.status_code == 200 else [])
+        except (httpx.HTTPError, httpx.InvalidURL):
+            robots.parse([])
+        self._robots = robots
+
+    def _allowed(self, url: str) -> bool:
+        return _host(url) == self.site and (
+            self._robots is None or self._robots.can_fetch(USER_AGENT, url)
+        )
+
+    async def _polite_get(self, client: httpx.AsyncClient, url: str) -> Optional[Tuple[str, str]]:
+        """
+        (final URL, html) after redirects, or None for non-HTML, oversized
+        or error responses and for redirects that leave the site.
+        """
+        host = urlparse(url).netloc
+        slots = self._host_slots.setdefault(host, asyncio.Semaphore(self.per_host_concurrency))
+
+        async with slots:
+            # Space out request starts to this host by min_delay
+            now = time.monotonic()
+            start_at = max(now, self._host_next_at.get(host, now))
+            self._host_next_at[host] = start_at + self.min_delay
+            if start_at > now:
+                await asyncio.sleep(start_at - now)
+
+            async with client.stream("GET", url) as response:
+                final_url = str(response.url)
+                if final_url != url and not self._allowed(final_url):
+                    return None
+                if response.status_code != 200 or "html" not in response.headers.get("content-type", ""):
+                    return None
+                chunks, size = [], 0
+                async for chunk in response.aiter_bytes():
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        return None
+                return final_url, b"".join(chunks).decode(response.encoding or "utf-8", errors="replace")
+
+    # -----------------------
+    # CRAWL
+    # -----------------------
+    async def crawl(self) -> AsyncIterator[CrawledPage]:
+        frontier: asyncio.Queue = asyncio.Queue()
+        results: asyncio.Queue = asyncio.Queue()
+        seen_urls = {self.start_url}
+        seen_hashes = set()
+        done = object()
+
+        async with httpx.AsyncClient(
+            headers={"User-Agent": USER_AGENT, "Accept": "text/html,application/xhtml+xml"},
+            timeout=self.timeout,
+            follow_redirects=True,
+        ) as client:
+            await self._load_robots(client)
+            frontier.put_nowait((self.start_url, 0))
+
+            async def worker():
+                while True:
+                    url, depth = await frontier.get()
+                    try:
+                        fetched = await self._polite_get(client, url) if self._allowed(url) else None
+                        if fetched is None:
+                            continue
+                        url, html = fetched
+                        self.fetched += 1
+
+                        # Off the event loop: parsing a 3 MB page takes a while
+                        digest, links = await asyncio.to_thread(parse_page, html, url)
+                        if digest in seen_hashes:
+                            self.duplicates += 1
+                            continue
+                        seen_hashes.add(digest)
+                        await results.put(CrawledPage(url, depth, html, digest))
+
+                        if depth < self.max_depth:
+                            for link in links:
+                                if len(seen_urls) >= self.max_pages:
+                                    break
+                                if link not in seen_urls and self._allowed(link):
+                                    seen_urls.add(link)
+                                    frontier.put_nowait((link, depth + 1))
+                    except Exception:
+                        # A bad page must never stop the crawl
+                        self.errors += 1
+                    finally:
+                        frontier.task_done()
+
+            async def supervisor():
+                await frontier.join()
+                await results.put(done)
+
+            workers = [asyncio.create_task(worker()) for _ in range(self.per_host_concurrency)]
+            watcher = asyncio.create_task(supervisor())
+            try:
+                while True:
+                    page = await results.get()
+                    if page is done:
+                        break
+                    yield page
+            finally:
+                for task in [*workers, watcher]:
+                    task.cancel()
+                await asyncio.gather(*workers, watcher, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {"fetched": self.fetched, "duplicates": self.duplicates, "errors": self.errors}
@@ -0,0 +1,45 @@
+"""
+helpers.py
+
+Small shared helpers.
+"""
+
+import httpx
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+
+def normalize_url(url: str) -> str:
+    url = url.strip()
+    if not url.startswith(("http://", "https://")):
+        url = "https://" + url
+    return url
+
+
+def fetch_html(url: str, timeout: float = 15.0, max_bytes: int = 3_000_000) -> str:
+    """
+    Fetches a page and returns its HTML. Raises ValueError on any failure
+    so callers can surface it as a client error.
+    """
+    try:
+        with httpx.stream(
+            "GET",
+            normalize_url(url),
+            headers={"User-Agent": USER_AGENT, "Accept": "text/html,application/xhtml+xml"},
+            timeout=timeout,
+            follow_redirects=True,
+        ) as response:
+            response.raise_for_status()
+            chunks, size = [], 0
+            for chunk in response.iter_bytes():
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ValueError("Page too large")
+            return b"".join(chunks).decode(response.encoding or "utf-8", errors="replace")
+    except (httpx.HTTPError, httpx.InvalidURL) as e:
+        # InvalidURL is not an HTTPError subclass
+        raise ValueError(f"Could not fetch page: {str(e).splitlines()[0]}")
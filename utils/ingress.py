@@ -0,0 +1,205 @@
+"""
+ingress.py
+
+Ingress Fast Path
+- Body size caps enforced while the body streams in, before any parsing
+- Faster JSON rendering when orjson is available
+- Negotiated brotli / gzip compression for large responses
+"""
+
+import gzip
+import json
+from typing import Dict, Optional
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is always available
+    brotli = None
+
+
+# -----------------------
+# FAST JSON
+# -----------------------
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson when installed.
+    Falls back to the standard encoder otherwise.
+    """
+
+    def render(self, content) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+async def _send_json(send, status: int, payload: dict) -> None:
+    body = json.dumps(payload).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+# -----------------------
+# BODY SIZE LIMIT
+# -----------------------
+class BodySizeLimitMiddleware:
+    """
+    Rejects request bodies over a per-route byte cap with a 413.
+
+    Content-Length is checked first; otherwise the body is buffered
+    chunk by chunk and the request is dropped as soon as it crosses
+    the cap, so the app never parses an oversized payload.
+    """
+
+    def __init__(self, app, limits: Dict[str, int], default_limit: int):
+        self.app = app
+        self.limits = limits
+        self.default_limit = default_limit
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in ("GET", "HEAD", "OPTIONS"):
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.limits.get(scope["path"], self.default_limit)
+
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    declared = int(value)
+                except ValueError:
+                    declared = 0
+                if declared > limit:
+                    await _send_json(send, 413, {"detail": "Input too large"})
+                    return
+                break
+
+        chunks = []
+        received = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunk = message.get("body", b"")
+            received += len(chunk)
+            if received > limit:
+                await _send_json(send, 413, {"detail": "Input too large"})
+                return
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                break
+
+        body = b"".join(chunks)
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        await self.app(scope, replay, send)
+
+
+# -----------------------
+# COMPRESSION
+# -----------------------
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    offered = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        offered[token.strip().lower()] = q
+
+    if brotli is not None and offered.get("br", 0) > 0:
+        return "br"
+    if offered.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=4)
+    return gzip.compress(body, compresslevel=5)
+
+
+class CompressionMiddleware:
+    """
+    Compresses single-part responses above minimum_size with the best
+    encoding the client accepts (br, then gzip).
+    Streaming responses are passed through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+
+        encoding = negotiate_encoding(accept) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+
+        async def compressing_send(message):
+            nonlocal start_message
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            body = message.get("body", b"")
+            headers = [(k, v) for k, v in start["headers"] if k != b"content-length"]
+            already_encoded = any(k == b"content-encoding" for k, _ in headers)
+
+            if message.get("more_body", False) or already_encoded or len(body) < self.minimum_size:
+                await send(start)
+                await send(message)
+                return
+
+            body = compress(body, encoding)
+            headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(body)).encode()),
+                (b"vary", b"Accept-Encoding"),
+            ]
+            await send({**start, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, compressing_send)
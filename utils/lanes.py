@@ -0,0 +1,103 @@
+"""
+lanes.py
+
+Priority Lanes
+Each endpoint class gets its own concurrency slots, queue depth and
+worker threads, so a burst of heavy audits can only saturate its own
+lane while short, interactive calls keep moving.
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Dict
+
+import anyio
+from anyio import to_thread
+
+DEFAULT_LANES = {
+    "interactive": {"weight": 3, "queue_depth": 50},
+    "heavy": {"weight": 1, "queue_depth": 20},
+}
+
+
+class LaneFullError(RuntimeError):
+    """Raised when a lane's queue is already at its configured depth."""
+
+
+class Lane:
+
+    def __init__(self, name: str, slots: int, queue_depth: int):
+        self.name = name
+        self.slots = slots
+        self.queue_depth = queue_depth
+
+        self._semaphore = asyncio.Semaphore(slots)
+        # Own worker tokens, so lanes never compete for the shared threadpool
+        self._limiter = anyio.CapacityLimiter(slots)
+
+        self.waiting = 0
+        self.running = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._waits: deque = deque(maxlen=1000)
+
+    async def run(self, fn, *args):
+        """
+        Waits for a slot (or rejects if the queue is full), then runs
+        fn(*args) on this lane's worker threads.
+        """
+        if self.waiting >= self.queue_depth and self._semaphore.locked():
+            self.rejected += 1
+            raise LaneFullError(f"Lane '{self.name}' is full")
+
+        self.waiting += 1
+        start = time.perf_counter()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        self._waits.append(time.perf_counter() - start)
+        self.admitted += 1
+        self.running += 1
+        try:
+            return await to_thread.run_sync(lambda: fn(*args), limiter=self._limiter)
+        finally:
+            self.running -= 1
+            self._semaphore.release()
+
+    def snapshot(self) -> dict:
+        waits = sorted(self._waits)
+
+        def pct(p):
+            return round(waits[int(p * (len(waits) - 1))] * 1000, 1) if waits else 0.0
+
+        return {
+            "slots": self.slots,
+            "queue_depth": self.queue_depth,
+            "running": self.running,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "queue_wait_ms": {"p50": pct(0.5), "p95": pct(0.95), "max": pct(1.0)},
+        }
+
+
+def build_lanes(total_slots: int, config_json: str = "") -> Dict[str, Lane]:
+    """
+    Builds lanes from DEFAULT_LANES merged with an optional JSON config,
+    e.g. {"heavy": {"slots": 2, "queue_depth": 10}}. Lanes without an
+    explicit slot count share total_slots in proportion to their weight.
+    """
+    config = {name: dict(values) for name, values in DEFAULT_LANES.items()}
+    for name, values in (json.loads(config_json) if config_json else {}).items():
+        config.setdefault(name, {"weight": 1, "queue_depth": 20}).update(values)
+
+    total_weight = sum(c.get("weight", 1) for c in config.values())
+    lanes = {}
+    for name, c in config.items():
+        slots = c.get("slots") or max(1, round(total_slots * c.get("weight", 1) / total_weight))
+        lanes[name] = Lane(name, int(slots), int(c.get("queue_depth", 20)))
+    return lanes
@@ -0,0 +1,239 @@
+"""
+openai_client.py
+
+Single entry point for upstream chat completions.
+Every brain goes through here so usage, circuit breaking, degraded
+fallbacks and cancellation are handled in one place.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import httpx
+from openai import APIConnectionError, APIStatusError, APITimeoutError, OpenAI, RateLimitError
+
+from utils.cancellation import (
+    CancelToken,
+    DeadlineExceeded,
+    RequestCancelled,
+    cancel_stats,
+    current_token,
+)
+from utils.cassette import REPLAY, CassetteTransport
+from utils.circuit_breaker import CircuitOpenError, get_breaker
+from utils.usage_ledger import usage_ledger
+
+# -----------------------
+# CLIENT
+# -----------------------
+_transports = {}
+_transports_lock = threading.Lock()
+
+
+def build_client(api_key: str) -> OpenAI:
+    """
+    Builds the OpenAI client for a brain.
+
+    OPENAI_CASSETTE_MODE=record|replay routes traffic through a cassette
+    at OPENAI_CASSETTE (default cassettes/openai.json); set
+    OPENAI_CASSETTE_PACED=1 to replay at the recorded latency.
+    """
+    mode = os.getenv("OPENAI_CASSETTE_MODE")
+    if not mode:
+        return OpenAI(api_key=api_key)
+
+    path = os.getenv("OPENAI_CASSETTE", "cassettes/openai.json")
+    with _transports_lock:
+        transport = _transports.get(path)
+        if transport is None or transport.mode != mode:
+            transport = _transports[path] = CassetteTransport(
+                path, mode, paced=os.getenv("OPENAI_CASSETTE_PACED") == "1"
+            )
+
+    return OpenAI(
+        api_key=api_key,
+        http_client=httpx.Client(transport=transport),
+        max_retries=0 if mode == REPLAY else 2,
+    )
+
+
+# -----------------------
+# LAST-GOOD RESPONSE CACHE
+# -----------------------
+_CACHE_SIZE = 512
+_cache: "OrderedDict[str, object]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cache_key(kwargs: dict) -> str:
+    raw = json.dumps(kwargs, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _cache_get(key: str):
+    with _cache_lock:
+        response = _cache.get(key)
+        if response is not None:
+            _cache.move_to_end(key)
+        return response
+
+
+def _cache_put(key: str, response) -> None:
+    with _cache_lock:
+        _cache[key] = response
+        _cache.move_to_end(key)
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def _collect_stream(stream, token: CancelToken, progress: dict):
+    """
+    Reads a streamed completion into the same shape as a normal response,
+    closing the upstream stream as soon as the token fires.
+
+    progress["chars"] tracks generated text so far, so an aborted call
+    can still be billed to the ledger.
+    """
+    contents = {}
+    finish = {}
+    usage = None
+    chunks = 0
+
+    try:
+        for chunk in stream:
+            if token.cancelled or (token.remaining() is not None and token.remaining() <= 0):
+                stream.close()
+                cancel_stats.add(upstream_calls_aborted=1, chunks_discarded=chunks)
+                token.raise_if_done()
+            chunks += 1
+            if chunk.usage is not None:
+                usage = chunk.usage
+            for choice in chunk.choices:
+                piece = choice.delta.content or ""
+                progress["chars"] += len(piece)
+                contents.setdefault(choice.index, []).append(piece)
+                if choice.finish_reason:
+                    finish[choice.index] = choice.finish_reason
+    finally:
+        stream.close()
+
+    choices = [
+        SimpleNamespace(
+            index=i,
+            message=SimpleNamespace(role="assistant", content="".join(contents[i])),
+            finish_reason=finish.get(i),
+        )
+        for i in sorted(contents)
+    ]
+    return SimpleNamespace(choices=choices, usage=usage)
+
+
+def _record_aborted(brain: str, model: str, kwargs: dict, progress: dict, latency: float) -> None:
+    """
+    Usage only arrives in a stream's last chunk, so an aborted call is
+    recorded with estimates: the prompt from the request, the completion
+    from the text received (~4 chars per token).
+    """
+    prompt_chars = sum(len(str(m.get("content") or "")) for m in kwargs.get("messages", []))
+    usage_ledger.record(
+        brain,
+        model,
+        prompt_tokens=(prompt_chars + 3) // 4,
+        completion_tokens=(progress["chars"] + 3) // 4,
+        latency_s=latency,
+        ok=False,
+    )
+
+
+def _is_upstream_failure(exc: Exception) -> bool:
+    """
+    Whether an error says the upstream is unhealthy. Bad requests, auth
+    errors and our own bugs are not, and must not open the circuit.
+    """
+    if isinstance(exc, (APIConnectionError, RateLimitError, httpx.TransportError)):
+        return True
+    return isinstance(exc, APIStatusError) and exc.status_code >= 500
+
+
+def create_chat_completion(client, brain: str, **kwargs):
+    """
+    Calls client.chat.completions.create(**kwargs) and records
+    token usage and latency for the calling brain.
+
+    While the (model, brain) circuit is open, the last good response for the
+    same request is served instead; without one, CircuitOpenError is
+    raised immediately.
+
+    Inside a request with a CancelToken the completion is streamed, so a
+    client disconnect or an expired deadline aborts the upstream call
+    between chunks instead of paying for the full generation.
+    """
+    model = kwargs.get("model", "unknown")
+    breaker = get_breaker(model, brain)
+    key = _cache_key(kwargs)
+    token = current_token.get()
+
+    if token is not None:
+        token.raise_if_done()
+
+    if not breaker.allow():
+        cached = _cache_get(key)
+        if cached is not None:
+            return cached
+        raise CircuitOpenError(f"Circuit open for {breaker.name}")
+
+    start = time.perf_counter()
+    progress = {"chars": 0}
+    try:
+        if token is None:
+            response = client.chat.completions.create(**kwargs)
+        else:
+            remaining = token.remaining()
+            if remaining is not None:
+                client = client.with_options(timeout=max(remaining, 0.1), max_retries=0)
+            stream = client.chat.completions.create(
+                **kwargs, stream=True, stream_options={"include_usage": True}
+            )
+            response = _collect_stream(stream, token, progress)
+    except (RequestCancelled, DeadlineExceeded):
+        # Not the upstream's fault; don't count it against the circuit
+        breaker.abandon()
+        _record_aborted(brain, model, kwargs, progress, time.perf_counter() - start)
+        raise
+    except APITimeoutError:
+        if token is not None and token.remaining() is not None and token.remaining() <= 0:
+            breaker.abandon()
+            cancel_stats.add(upstream_calls_aborted=1)
+            _record_aborted(brain, model, kwargs, progress, time.perf_counter() - start)
+            raise DeadlineExceeded("Deadline exceeded")
+        latency = time.perf_counter() - start
+        breaker.record(False, latency)
+        usage_ledger.record(brain, model, latency_s=latency, ok=False)
+        raise
+    except Exception as e:
+        latency = time.perf_counter() - start
+        if _is_upstream_failure(e):
+            breaker.record(False, latency)
+        else:
+            breaker.abandon()
+        usage_ledger.record(brain, model, latency_s=latency, ok=False)
+        raise
+
+    latency = time.perf_counter() - start
+    breaker.record(True, latency)
+
+    usage = getattr(response, "usage", None)
+    usage_ledger.record(
+        brain,
+        model,
+        prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+        completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+        latency_s=latency,
+    )
+    _cache_put(key, response)
+    return response
@@ -0,0 +1,203 @@
+"""
+page_segments.py
+
+Section-aware Page Segmentation
+Splits a page's DOM into typed blocks (hero, features, social proof,
+pricing, FAQ, CTA) with approximate token counts, then picks the blocks
+each brain actually needs within a token budget.
+"""
+
+import re
+from dataclasses import dataclass, replace
+from typing import Dict, List
+
+from bs4 import BeautifulSoup, NavigableString
+
+NOISE_TAGS = ["head", "script", "style", "noscript", "svg", "iframe", "nav", "footer", "template", "select"]
+NOISE_CLASS_RE = re.compile(r"(^|[-_ ])(menu|nav|navigation|navbar|top-bar|cookie|modal)([-_ ]|$)", re.I)
+
+# Inline tags never own a line: their text joins the enclosing element's
+INLINE_TAGS = {
+    "a", "span", "strong", "em", "b", "i", "u", "s", "small", "mark", "sup", "sub",
+    "abbr", "cite", "code", "q", "time", "label", "data", "bdi", "bdo", "font",
+}
+HEADING_TAGS = {"h1", "h2", "h3"}
+CONTAINER_TAGS = ["section", "header", "article", "aside", "main"]
+
+BLOCK_TYPES = ["hero", "features", "social_proof", "pricing", "faq", "cta", "other"]
+
+# Which blocks each brain sees, in priority order, and its token budget
+BRAIN_BLOCKS = {
+    "leadgen": (["hero", "cta"], 300),
+    "section": (["hero"], 900),
+    "outreach": (["hero", "social_proof", "pricing", "cta"], 700),
+    "deep_dive": (["hero", "pricing", "social_proof", "cta", "features", "faq", "other"], 2800),
+}
+
+_SIGNALS = {
+    "pricing": re.compile(r"pricing|per month|/mo\b|/month|per user|billed|[$€£]\s?\d|\bplans?\b", re.I),
+    "social_proof": re.compile(r"testimonial|review|trusted by|customers|case stud|rated|★|⭐|\bclients\b|loved by", re.I),
+    "faq": re.compile(r"\bfaq\b|frequently asked|questions", re.I),
+    "cta": re.compile(r"get started|sign up|start (your )?free|free trial|book a (demo|call)|request a demo|contact (us|sales)|join now|try it", re.I),
+    "features": re.compile(r"features?|how it works|benefits|capabilit|integrations?|why \w+", re.I),
+}
+
+
+@dataclass
+class Block:
+    type: str
+    heading: str
+    text: str
+    tokens: int
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 chars per token for English; good enough for budgeting
+    return (len(text) + 3) // 4
+
+
+def _is_noise(element) -> bool:
+    attrs = " ".join([element.get("id") or "", *(element.get("class") or [])])
+    return bool(attrs) and bool(NOISE_CLASS_RE.search(attrs))
+
+
+def _container_of(element):
+    for parent in element.parents:
+        if parent.name in CONTAINER_TAGS:
+            return parent
+    return None
+
+
+def _classify(heading: str, text: str, hints: str, index: int, has_h1: bool) -> str:
+    if index == 0 or has_h1:
+        return "hero"
+
+    head_and_hints = f"{heading} {hints}"
+    for kind in ["pricing", "faq", "social_proof", "features"]:
+        if _SIGNALS[kind].search(head_and_hints):
+            return kind
+    for kind in ["pricing", "social_proof", "faq"]:
+        if len(_SIGNALS[kind].findall(text)) >= 2:
+            return kind
+    if _SIGNALS["cta"].search(text) and len(text) < 400:
+        return "cta"
+    if _SIGNALS["features"].search(text):
+        return "features"
+    return "other"
+
+
+def segment_html(html: str) -> List[Block]:
+    """
+    Returns the page's content blocks in document order.
+
+    Every visible text node is kept, grouped into lines by its nearest
+    non-inline element. A new block starts at every h1-h3 or when the
+    enclosing section/header/article changes.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+
+    for element in soup(NOISE_TAGS):
+        element.decompose()
+    for element in soup.find_all(_is_noise):
+        element.decompose()
+
+    # Text nodes grouped into lines by their nearest non-inline element,
+    # so copy in div/span/a markup is kept, not just p/li/h*
+    lines = []
+    for node in soup.find_all(string=True):
+        if type(node) is not NavigableString or node.parent is None:
+            continue
+        owner = node.parent
+        while owner.name in INLINE_TAGS and owner.parent is not None:
+            owner = owner.parent
+        if lines and lines[-1][0] is owner:
+            lines[-1][1].append(str(node))
+        elif node.strip():
+            lines.append((owner, [str(node)]))
+
+    raw_blocks = []
+    current = None
+    current_container = None
+    seen_text = set()
+
+    for owner, parts in lines:
+        text = " ".join("".join(parts).split())
+        if text in seen_text:
+            continue
+        seen_text.add(text)
+
+        heading_tag = next(
+            (e.name for e in [owner, *owner.parents] if e.name in HEADING_TAGS), None
+        )
+        container = _container_of(owner)
+        starts_block = heading_tag is not None or container is not current_container
+        if current is None or starts_block:
+            hints = ""
+            if container is not None:
+                hints = " ".join([container.get("id") or "", *(container.get("class") or [])])
+            current = {"heading": "", "lines": [], "hints": hints, "has_h1": False}
+            raw_blocks.append(current)
+            current_container = container
+
+        # Class/id of the line's nearest wrappers help classify div-only pages
+        for element in [owner, *owner.parents][:3]:
+            if element is container or element.name in ("html", "body", "[document]"):
+                break
+            current["hints"] += " " + " ".join([element.get("id") or "", *(element.get("class") or [])])
+        if heading_tag and not current["heading"]:
+            current["heading"] = text
+        current["has_h1"] = current["has_h1"] or heading_tag == "h1"
+        current["lines"].append(text)
+
+    blocks = []
+    for i, raw in enumerate(raw_blocks):
+        text = "\n".join(raw["lines"])
+        kind = _classify(raw["heading"], text, raw["hints"], i, raw["has_h1"])
+        blocks.append(Block(kind, raw["heading"], text, estimate_tokens(text)))
+
+    return blocks
+
+
+def trim_block(block: Block, max_tokens: int) -> Block:
+    """
+    Cuts a block's text to about max_tokens, at a line break or word
+    boundary where one is close.
+    """
+    limit = max_tokens * 4
+    text = block.text[:limit]
+    for sep in ("\n", " "):
+        cut = text.rfind(sep)
+        if cut >= limit * 0.6:
+            text = text[:cut]
+            break
+    text = text.rstrip() + " …"
+    return replace(block, text=text, tokens=estimate_tokens(text))
+
+
+def choose_blocks(blocks: List[Block], brain: str, min_trim_tokens: int = 30) -> Dict[int, Block]:
+    """
+    Picks the blocks a brain needs, by type priority, until its token
+    budget is spent. Keys are document positions. The first wanted block
+    that does not fit is trimmed to the remaining budget rather than
+    dropped, so one oversized block cannot leave the brain with nothing.
+    """
+    wanted, budget = BRAIN_BLOCKS[brain]
+
+    chosen: Dict[int, Block] = {}
+    remaining = budget
+    for kind in wanted:
+        for i, block in enumerate(blocks):
+            if block.type != kind:
+                continue
+            if block.tokens <= remaining:
+                chosen[i] = block
+                remaining -= block.tokens
+            elif remaining >= min_trim_tokens:
+                chosen[i] = trim_block(block, remaining)
+                remaining = 0
+
+    return chosen
+
+
+def render_blocks(blocks: List[Block]) -> str:
+    return "\n\n".join(f"[{b.type.upper()}]\n{b.text}" for b in blocks)
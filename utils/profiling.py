@@ -0,0 +1,174 @@
+"""
+profiling.py
+
+Opt-in Request Profiling
+A sampling profiler that snapshots every thread's stack while a single
+request is in flight and writes the result as folded stacks
+(flamegraph.pl / speedscope compatible) to a local directory.
+
+Sync endpoints run on the threadpool, so every thread is sampled and
+tagged with its thread name; other requests in flight at the same
+time will show up too.
+
+ProfileMiddleware is pure ASGI, so a trace covers the whole response
+including streamed bodies, not just the time to the first byte.
+"""
+
+import asyncio
+import os
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from typing import List, Optional
+
+
+class _Sampler(threading.Thread):
+
+    def __init__(self, interval: float):
+        super().__init__(name="request-profiler", daemon=True)
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class RequestProfiler:
+
+    def __init__(
+        self,
+        directory: str = "logs/profiles",
+        sample_rate: float = 0.0,
+        max_files: int = 50,
+        interval: float = 0.005,
+    ):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.max_files = max_files
+        self.interval = interval
+        os.makedirs(directory, exist_ok=True)
+
+    def should_profile(self, profile_header: Optional[str]) -> bool:
+        if profile_header and profile_header.lower() in ("1", "true", "yes"):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def start(self, method: str, path: str) -> dict:
+        """
+        Starts sampling all threads. Returns the trace handle; its "id"
+        is known up front so it can go into the response headers.
+        """
+        slug = re.sub(r"[^a-zA-Z0-9]+", "-", path).strip("-") or "root"
+        sampler = _Sampler(self.interval)
+        sampler.start()
+        return {
+            "id": f"{time.strftime('%Y%m%d-%H%M%S')}_{method}_{slug}_{secrets.token_hex(3)}",
+            "sampler": sampler,
+            "start": time.perf_counter(),
+        }
+
+    def finish(self, trace: dict) -> str:
+        """
+        Stops sampling and writes the trace (blocking; call off the
+        event loop). Returns the file name.
+        """
+        trace["sampler"].stop()
+        duration_ms = int((time.perf_counter() - trace["start"]) * 1000)
+        name = f"{trace['id']}_{duration_ms}ms.folded"
+        self._write(name, trace["sampler"].stacks)
+        return name
+
+    def _write(self, name: str, stacks: Counter) -> None:
+        with open(os.path.join(self.directory, name), "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        self._enforce_retention()
+
+    def _enforce_retention(self) -> None:
+        traces = self.list_traces()
+        for old in traces[self.max_files:]:
+            try:
+                os.remove(os.path.join(self.directory, old["name"]))
+            except OSError:
+                pass
+
+    def list_traces(self) -> List[dict]:
+        """Newest first."""
+        traces = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".folded"):
+                continue
+            stat = os.stat(os.path.join(self.directory, name))
+            traces.append({"name": name, "bytes": stat.st_size, "created": stat.st_mtime})
+        return sorted(traces, key=lambda t: t["created"], reverse=True)
+
+    def trace_path(self, name: str) -> Optional[str]:
+        """
+        Accepts a listed file name or a trace id (X-Profile-Id).
+        """
+        # Only names we listed ourselves, so no path traversal
+        for trace in self.list_traces():
+            if trace["name"] == name or trace["name"].startswith(name + "_"):
+                return os.path.join(self.directory, trace["name"])
+        return None
+
+
+class ProfileMiddleware:
+    """
+    Profiles sampled requests from the first byte in to the last byte
+    out. should_profile(headers) decides per request; the trace id is
+    returned in X-Profile-Id.
+    """
+
+    def __init__(self, app, profiler: RequestProfiler, should_profile):
+        self.app = app
+        self.profiler = profiler
+        self.should_profile = should_profile
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+        if not self.should_profile(headers):
+            await self.app(scope, receive, send)
+            return
+
+        trace = self.profiler.start(scope["method"], scope["path"])
+
+        async def profiled_send(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", trace["id"].encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, profiled_send)
+        finally:
+            # Joining the sampler and writing the file must not block the loop
+            await asyncio.to_thread(self.profiler.finish, trace)
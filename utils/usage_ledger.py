@@ -0,0 +1,277 @@
+"""
+usage_ledger.py
+
+Token & Cost Ledger
+Every brain call records prompt/completion tokens and latency here.
+Recording is a lock-free deque append; a background thread folds
+pending entries into per-minute buckets and appends the per-bucket
+deltas to one JSONL file per UTC day. Files past retention are deleted,
+so a restart only re-reads aggregates within retention.
+"""
+
+import calendar
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+# USD per 1M tokens (input, output) — used for estimates only
+MODEL_PRICES = {
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4-turbo-preview": (10.00, 30.00),
+}
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    price_in, price_out = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * price_in + completion_tokens * price_out) / 1_000_000
+
+
+class UsageLedger:
+
+    FIELDS = ("calls", "errors", "prompt_tokens", "completion_tokens", "latency_s")
+    DAY_SECONDS = 24 * 3600
+
+    def __init__(
+        self,
+        path: str = "logs/usage.jsonl",  # daily files: logs/usage-YYYYMMDD.jsonl
+        bucket_seconds: int = 60,
+        retention_seconds: int = 7 * 24 * 3600,
+    ):
+        self.path = path
+        self.bucket_seconds = bucket_seconds
+        self.retention_seconds = retention_seconds
+
+        # deque.append / popleft are atomic, so callers never take a lock
+        self._pending: deque = deque()
+        self._buckets: Dict[Tuple[int, str, str], list] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pruned_day = -1
+
+        root, ext = os.path.splitext(path)
+        self._directory = os.path.dirname(path)
+        self._prefix = os.path.basename(root) + "-"
+        self._ext = ext
+        self._day_re = re.compile(re.escape(self._prefix) + r"(\d{8})" + re.escape(ext) + "$")
+
+    # -----------------------
+    # RECORDING (HOT PATH)
+    # -----------------------
+    def record(
+        self,
+        brain: str,
+        model: str,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        latency_s: float = 0.0,
+        ok: bool = True,
+    ) -> None:
+        self._pending.append({
+            "ts": time.time(),
+            "brain": brain,
+            "model": model,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "latency_s": round(latency_s, 4),
+            "ok": ok,
+        })
+
+    # -----------------------
+    # AGGREGATION
+    # -----------------------
+    def _fold(self, target: Dict[Tuple[int, str, str], list], key: Tuple[int, str, str], values) -> None:
+        row = target.get(key)
+        if row is None:
+            row = target[key] = [0, 0, 0, 0, 0.0]
+        for i, value in enumerate(values):
+            row[i] += value
+
+    def _fold_entry(self, target: Dict[Tuple[int, str, str], list], entry: dict) -> None:
+        bucket = int(entry["ts"]) // self.bucket_seconds * self.bucket_seconds
+        self._fold(target, (bucket, entry["brain"], entry["model"]), (
+            1,
+            0 if entry["ok"] else 1,
+            entry["prompt_tokens"],
+            entry["completion_tokens"],
+            entry["latency_s"],
+        ))
+
+    # -----------------------
+    # DAILY FILES
+    # -----------------------
+    def _day_path(self, day: int) -> str:
+        stamp = time.strftime("%Y%m%d", time.gmtime(day * self.DAY_SECONDS))
+        return os.path.join(self._directory, f"{self._prefix}{stamp}{self._ext}")
+
+    def _day_files(self) -> List[Tuple[int, str]]:
+        """
+        (day number, path) of every daily file on disk.
+        """
+        try:
+            names = os.listdir(self._directory or ".")
+        except OSError:
+            return []
+        files = []
+        for name in names:
+            match = self._day_re.match(name)
+            if match:
+                day = calendar.timegm(time.strptime(match.group(1), "%Y%m%d")) // self.DAY_SECONDS
+                files.append((day, os.path.join(self._directory, name)))
+        return sorted(files)
+
+    def _oldest_kept_day(self) -> int:
+        return int(time.time() - self.retention_seconds) // self.DAY_SECONDS
+
+    def _append(self, deltas: Dict[Tuple[int, str, str], list]) -> None:
+        by_day: Dict[int, List[str]] = {}
+        for (bucket, brain, model), row in sorted(deltas.items()):
+            line = {"bucket": bucket, "brain": brain, "model": model, **dict(zip(self.FIELDS, row))}
+            line["latency_s"] = round(line["latency_s"], 4)
+            by_day.setdefault(bucket // self.DAY_SECONDS, []).append(json.dumps(line) + "\n")
+
+        if self._directory:
+            os.makedirs(self._directory, exist_ok=True)
+        for day, lines in by_day.items():
+            with open(self._day_path(day), "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+
+    def _prune_files(self) -> None:
+        today = int(time.time()) // self.DAY_SECONDS
+        if today == self._pruned_day:
+            return
+        self._pruned_day = today
+        oldest = self._oldest_kept_day()
+        for day, path in self._day_files():
+            if day < oldest:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def flush(self) -> int:
+        """
+        Drains pending entries into the buckets and appends their
+        per-bucket deltas to the daily files.
+        Returns the number of entries flushed.
+        """
+        with self._lock:
+            drained = []
+            while self._pending:
+                drained.append(self._pending.popleft())
+            if not drained:
+                return 0
+
+            deltas: Dict[Tuple[int, str, str], list] = {}
+            for entry in drained:
+                self._fold_entry(deltas, entry)
+            for key, row in deltas.items():
+                self._fold(self._buckets, key, row)
+
+            cutoff = time.time() - self.retention_seconds
+            for key in [k for k in self._buckets if k[0] < cutoff]:
+                del self._buckets[key]
+
+            self._append(deltas)
+            self._prune_files()
+
+        return len(drained)
+
+    def load(self) -> None:
+        """
+        Rebuilds the buckets from the daily files within retention.
+        A legacy single file of raw entries is folded into daily files
+        once and removed.
+        """
+        cutoff = time.time() - self.retention_seconds
+        oldest = self._oldest_kept_day()
+
+        with self._lock:
+            if os.path.exists(self.path):
+                legacy: Dict[Tuple[int, str, str], list] = {}
+                for entry in self._read(self.path):
+                    if entry.get("ts", 0) >= cutoff:
+                        self._fold_entry(legacy, entry)
+                self._append(legacy)
+                os.remove(self.path)
+
+            for day, path in self._day_files():
+                if day < oldest:
+                    continue
+                for row in self._read(path):
+                    if row.get("bucket", 0) >= cutoff:
+                        key = (row["bucket"], row["brain"], row["model"])
+                        self._fold(self._buckets, key, [row[f] for f in self.FIELDS])
+
+            self._prune_files()
+
+    @staticmethod
+    def _read(path: str):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line from a crash
+
+    def start(self, interval: float = 10.0) -> None:
+        if self._thread is not None:
+            return
+        self.load()
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.flush()
+                except OSError:
+                    pass
+
+        self._thread = threading.Thread(target=loop, name="usage-ledger", daemon=True)
+        self._thread.start()
+
+    # -----------------------
+    # QUERY
+    # -----------------------
+    def totals(self, window_seconds: Optional[int] = None) -> dict:
+        self.flush()
+
+        since = time.time() - window_seconds if window_seconds else 0
+        fields = self.FIELDS + ("cost_usd",)
+        overall = dict.fromkeys(fields, 0)
+        by_brain: Dict[str, dict] = {}
+        by_model: Dict[str, dict] = {}
+
+        with self._lock:
+            rows = [
+                (k, list(v)) for k, v in self._buckets.items()
+                if k[0] + self.bucket_seconds > since
+            ]
+
+        for (_, brain, model), row in rows:
+            row.append(estimate_cost(model, row[2], row[3]))
+            for target in (
+                overall,
+                by_brain.setdefault(brain, dict.fromkeys(fields, 0)),
+                by_model.setdefault(model, dict.fromkeys(fields, 0)),
+            ):
+                for field, value in zip(fields, row):
+                    target[field] += value
+
+        for target in [overall, *by_brain.values(), *by_model.values()]:
+            target["latency_s"] = round(target["latency_s"], 3)
+            target["cost_usd"] = round(target["cost_usd"], 6)
+
+        return {
+            "window_seconds": window_seconds,
+            "totals": overall,
+            "by_brain": by_brain,
+            "by_model": by_model,
+        }
+
+
+usage_ledger = UsageLedger()
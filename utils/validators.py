@@ -0,0 +1,364 @@
+"""
+validators.py
+
+Output Validators
+Checks every brain output against the rules its prompt states (banned
+words, strict headings, line and word counts, no bullets / emojis).
+On a violation only the failing section is regenerated when the
+problems sit in one section; otherwise the call is retried once with a
+targeted correction. Violation rates are kept per brain.
+"""
+
+import os
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.audit_history import FINDING_HEADINGS
+from utils.cancellation import DeadlineExceeded, RequestCancelled
+
+_QUOTES = str.maketrans({"’": "'", "‘": "'", "–": "-", "—": "-"})
+
+
+# -----------------------
+# MULTI-PATTERN MATCHER
+# -----------------------
+def _inflections(word: str) -> List[str]:
+    if " " in word:
+        return [word]
+    stem = word[:-1] if word.endswith("e") else word
+    return [word, word + "s", stem + "ed", stem + "ing"]
+
+
+def _trie_pattern(node: dict) -> str:
+    branches = [re.escape(ch) + _trie_pattern(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if "" in node:
+        return "(?:" + body + ")?"
+    return body
+
+
+class PhraseMatcher:
+    """
+    All phrases (and simple inflections) compiled into one trie-shaped
+    regex, so a scan walks shared prefixes once instead of testing every
+    phrase. Matches whole words only, case-insensitive.
+    """
+
+    def __init__(self, phrases: List[str]):
+        self._canonical: Dict[str, str] = {}
+        trie: dict = {}
+        for phrase in phrases:
+            phrase = phrase.lower().translate(_QUOTES)
+            for form in _inflections(phrase):
+                self._canonical.setdefault(form, phrase)
+                node = trie
+                for ch in form:
+                    node = node.setdefault(ch, {})
+                node[""] = {}
+
+        self._re = re.compile(r"(?<![\w'-])" + _trie_pattern(trie) + r"(?![\w'-])", re.I)
+
+    def find(self, text: str) -> List[str]:
+        """
+        Distinct matched phrases, in order of first appearance.
+        """
+        found: Dict[str, None] = {}
+        for match in self._re.finditer(text.translate(_QUOTES)):
+            found[self._canonical.get(match.group(0).lower(), match.group(0).lower())] = None
+        return list(found)
+
+
+# -----------------------
+# BRAIN RULES
+# -----------------------
+# Only words a brain's own prompt bans by name; "no buzzwords" style
+# rules are left to the model, since matching them guesses and every
+# false hit costs a repair call
+BRAIN_RULES = {
+    "leadgen": {
+        "headings": ["REWRITTEN MICRO COPY", "WHY THIS WORKS"],
+        "banned": PhraseMatcher(["unlock", "discover", "what's working", "double your leads"]),
+        "banned_part": "REWRITTEN MICRO COPY",
+        "lines": ("REWRITTEN MICRO COPY", 2, 3),
+    },
+    "section": {
+        "headings": [
+            "WHAT'S HURTING CONVERSIONS",
+            "WHY THIS MATTERS",
+            "REWRITTEN SECTION",
+            "WHAT'S MISSING",
+        ],
+    },
+    "outreach": {
+        "headings": [],
+        "words": (80, 140),
+        "no_bullets": True,
+        "no_emoji": True,
+    },
+    "deep_dive": {
+        "headings": FINDING_HEADINGS,
+    },
+}
+
+_HEADING_RES = {
+    brain: re.compile(
+        r"^[ \t#*]*(" + "|".join(re.escape(h) for h in rules["headings"]) + r")\b[^\n:]{0,40}:[ \t*]*",
+        re.M | re.I,
+    )
+    for brain, rules in BRAIN_RULES.items()
+    if rules["headings"]
+}
+
+_WORD_RE = re.compile(r"[\w][\w'-]*")
+_BULLET_RE = re.compile(r"^\s*[-*•]\s+", re.M)
+_EMOJI_RE = re.compile("[\U0001F300-\U0001FAFF☀-➿⭐]")
+
+
+def split_parts(brain: str, text: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Body span (start, end) of each strict heading found in text,
+    keyed by the canonical heading.
+    """
+    heading_re = _HEADING_RES.get(brain)
+    if heading_re is None:
+        return {}
+
+    matches = list(heading_re.finditer(text.translate(_QUOTES)))
+    parts: Dict[str, Tuple[int, int]] = {}
+    for i, match in enumerate(matches):
+        heading = match.group(1).upper()
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        parts.setdefault(heading, (match.end(), end))
+    return parts
+
+
+def validate(brain: str, text: str) -> List[dict]:
+    """
+    Rule violations in one brain output. Each: {"rule", "part", "detail"};
+    part is the heading the problem sits under, or None for the whole text.
+    """
+    rules = BRAIN_RULES.get(brain)
+    if rules is None:
+        return []
+
+    violations: List[dict] = []
+    parts = split_parts(brain, text)
+
+    for heading in rules["headings"]:
+        if heading not in parts:
+            violations.append({"rule": "missing_heading", "part": None, "detail": heading})
+
+    def body(part: Optional[str]) -> Optional[str]:
+        if part is None:
+            return text
+        span = parts.get(part)
+        return text[span[0]:span[1]] if span else None
+
+    matcher = rules.get("banned")
+    if matcher is not None:
+        scope = body(rules["banned_part"])
+        for phrase in matcher.find(scope or ""):
+            violations.append({"rule": "banned_phrase", "part": rules["banned_part"], "detail": phrase})
+
+    if "lines" in rules:
+        part, low, high = rules["lines"]
+        scope = body(part)
+        if scope is not None:
+            count = sum(1 for line in scope.splitlines() if line.strip())
+            if not low <= count <= high:
+                violations.append({
+                    "rule": "line_count",
+                    "part": part,
+                    "detail": f"{count} lines (expected {low}-{high})",
+                })
+
+    if "words" in rules:
+        low, high = rules["words"]
+        count = len(_WORD_RE.findall(text))
+        if not low <= count <= high:
+            violations.append({
+                "rule": "word_count",
+                "part": None,
+                "detail": f"{count} words (expected {low}-{high})",
+            })
+
+    if rules.get("no_bullets") and _BULLET_RE.search(text):
+        violations.append({"rule": "bullets", "part": None, "detail": "bullet points are not allowed"})
+
+    if rules.get("no_emoji") and _EMOJI_RE.search(text):
+        violations.append({"rule": "emoji", "part": None, "detail": "emojis are not allowed"})
+
+    return violations
+
+
+def _describe(violations: List[dict]) -> str:
+    lines = []
+    for v in violations:
+        if v["rule"] == "banned_phrase":
+            lines.append(f'- Do not use "{v["detail"]}" (or any form of it)')
+        elif v["rule"] == "missing_heading":
+            lines.append(f"- Missing required heading: {v['detail']}:")
+        else:
+            lines.append(f"- {v['rule'].replace('_', ' ')}: {v['detail']}")
+    return "\n".join(lines)
+
+
+def correction_messages(brain: str, text: str, violations: List[dict]) -> Tuple[Optional[str], List[dict]]:
+    """
+    Follow-up messages asking the model to fix exactly these violations.
+
+    When every violation sits under one heading, only that section is
+    requested (returns its heading); otherwise the full answer is.
+    """
+    sections = {v["part"] for v in violations}
+    part = sections.pop() if len(sections) == 1 else None
+
+    if part is not None:
+        ask = (
+            f"Your answer broke these rules in the {part} section:\n"
+            f"{_describe(violations)}\n\n"
+            f"Rewrite ONLY the {part} section. Return just its new content, "
+            "without the heading and without any other section."
+        )
+    else:
+        ask = (
+            "Your answer broke these rules:\n"
+            f"{_describe(violations)}\n\n"
+            "Return the full answer again in the exact required format. "
+            "Fix only these problems; keep everything else."
+        )
+
+    return part, [
+        {"role": "assistant", "content": text},
+        {"role": "user", "content": ask},
+    ]
+
+
+def splice_part(brain: str, text: str, part: str, new_body: str) -> str:
+    """
+    Replaces the body under one heading, keeping the rest of the text.
+    """
+    span = split_parts(brain, text).get(part)
+    if span is None:
+        return text
+
+    # Drop a repeated heading line if the model echoed it
+    repeated = _HEADING_RES[brain].match(new_body.strip().translate(_QUOTES))
+    if repeated and repeated.group(1).upper() == part:
+        new_body = new_body.strip()[repeated.end():]
+
+    tail = text[span[1]:]
+    return text[:span[0]] + "\n" + new_body.strip() + ("\n\n" + tail.lstrip() if tail.strip() else "")
+
+
+# -----------------------
+# STATS
+# -----------------------
+class ValidationStats:
+
+    FIELDS = ("outputs", "violating", "repaired", "unrepaired", "repair_calls", "repair_errors")
+
+    def __init__(self):
+        self._brains: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def add(self, brain: str, rules: Optional[List[str]] = None, check_s: float = 0.0, **counts) -> None:
+        with self._lock:
+            row = self._brains.get(brain)
+            if row is None:
+                row = self._brains[brain] = {
+                    **dict.fromkeys(self.FIELDS, 0), "check_s": 0.0, "checks": 0, "by_rule": {},
+                }
+            for name, value in counts.items():
+                row[name] += value
+            if check_s:
+                row["check_s"] += check_s
+                row["checks"] += 1
+            for rule in rules or []:
+                row["by_rule"][rule] = row["by_rule"].get(rule, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            rows = {brain: dict(row, by_rule=dict(row["by_rule"])) for brain, row in self._brains.items()}
+
+        for row in rows.values():
+            row["violation_rate"] = round(row["violating"] / row["outputs"], 4) if row["outputs"] else 0.0
+            row["avg_check_us"] = round(row.pop("check_s") / max(row.pop("checks"), 1) * 1e6, 1)
+        return rows
+
+
+validation_stats = ValidationStats()
+
+
+def _timed_validate(brain: str, text: str) -> List[dict]:
+    start = time.perf_counter()
+    violations = validate(brain, text)
+    validation_stats.add(brain, check_s=time.perf_counter() - start)
+    return violations
+
+
+# -----------------------
+# ENFORCEMENT
+# -----------------------
+def record_output(brain: str, text: str) -> List[dict]:
+    """
+    Validates and counts one output without repairing it
+    (used where a retry is not worth it, e.g. multi-variant calls).
+    """
+    violations = _timed_validate(brain, text)
+    validation_stats.add(
+        brain,
+        rules=[v["rule"] for v in violations],
+        outputs=1,
+        violating=1 if violations else 0,
+    )
+    return violations
+
+
+def enforce(
+    brain: str,
+    text: str,
+    regenerate: Callable[[List[dict]], str],
+    max_retries: Optional[int] = None,
+) -> str:
+    """
+    Returns text if it passes the brain's rules. Otherwise asks the
+    model for a targeted fix via regenerate(extra_messages) and returns
+    the output with the fewest violations.
+
+    regenerate gets the follow-up messages to append to the original
+    conversation and returns the model's reply text.
+    """
+    if max_retries is None:
+        max_retries = int(os.getenv("OUTPUT_REPAIR_RETRIES", "1"))
+
+    violations = record_output(brain, text)
+    if not violations:
+        return text
+
+    best, best_violations = text, violations
+    for _ in range(max_retries):
+        part, extra = correction_messages(brain, best, best_violations)
+        try:
+            reply = regenerate(extra)
+        except (RequestCancelled, DeadlineExceeded):
+            raise
+        except Exception:
+            # A failed repair must not cost the caller the answer it already has
+            validation_stats.add(brain, repair_errors=1)
+            break
+        validation_stats.add(brain, repair_calls=1)
+
+        candidate = splice_part(brain, best, part, reply) if part else reply.strip()
+        candidate_violations = _timed_validate(brain, candidate)
+        if len(candidate_violations) < len(best_violations):
+            best, best_violations = candidate, candidate_violations
+        if not best_violations:
+            break
+
+    validation_stats.add(brain, **{"repaired" if not best_violations else "unrepaired": 1})
+    return best